@@ -66,12 +66,13 @@ setup(
     extras_require={
         "dev": [
             "pytest>=6.0.0",
-            "pytest-cov>=3.0.0",
+            "pytest-cov>=5.0.0",
             "pytest-mock>=3.6.0",
+            "pytest-xdist>=3.0.0",
             "flake8>=4.0.0",
             "black>=22.0.0",
             "isort>=5.0.0",
-            "coverage>=6.0.0",
+            "coverage>=7.4.0",
             "sphinx>=4.0.0",
             "sphinx-rtd-theme>=1.0.0",
             "bandit>=1.7.0",
@@ -79,8 +80,9 @@ setup(
         ],
         "test": [
             "pytest>=6.0.0",
-            "pytest-cov>=3.0.0",
+            "pytest-cov>=5.0.0",
             "pytest-mock>=3.6.0",
+            "pytest-xdist>=3.0.0",
         ],
         "docs": [
             "sphinx>=4.0.0",
@@ -42,9 +42,10 @@ from ..utils.signal_processing import (
     auto_decimation,
     cross_correlation_lag,
     design_base_filter,
-    estimate_rates_psd,
+    estimate_rates_psd_batch,
     quick_snr,
     safe_float,
+    safe_float_array,
     safe_int,
 )
 
@@ -311,8 +312,19 @@ class PlotManager:
         # Calculate power spectral density using Welch's method
         from scipy.signal import welch
 
-        f_r, P_r = welch(red_ac, fs=fs, nperseg=min(len(red_ac), 2048))
-        f_i, P_i = welch(ir_ac, fs=fs, nperseg=min(len(ir_ac), 2048))
+        # Power-of-two segment length (<= 2048 and the signal length) keeps the
+        # real FFT on its fastest radix-2 path
+        nperseg = 1 << (max(1, min(len(red_ac), len(ir_ac), 2048)).bit_length() - 1)
+
+        if len(red_ac) == len(ir_ac):
+            # Both channels in one batched Welch call
+            f_r, P = welch(
+                np.vstack([red_ac, ir_ac]), fs=fs, nperseg=nperseg, scaling="density", axis=-1
+            )
+            f_i, (P_r, P_i) = f_r, P
+        else:
+            f_r, P_r = welch(red_ac, fs=fs, nperseg=nperseg, scaling="density")
+            f_i, P_i = welch(ir_ac, fs=fs, nperseg=nperseg, scaling="density")
 
         # Create PSD and spectrogram plots
         fig_psd = self._create_psd_plot(f_r, P_r, f_i, P_i)
@@ -550,14 +562,17 @@ class PlotManager:
             return self.create_blank_figure(280)
 
         # Calculate cross-correlation
-        lags, correlation, max_corr_lag = cross_correlation_lag(red_ac, ir_ac, max_lag=1.0)
+        # Limit to +/- 1 s of lag; cross_correlation_lag works in samples
+        lags, correlation, max_corr_lag = cross_correlation_lag(
+            red_ac, ir_ac, max_lag=int(round(fs)), interpolate=True
+        )
         if lags is None:
             return self.create_blank_figure(280)
 
         # Create cross-correlation visualization
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=lags, y=correlation, mode="lines", name="xcorr"))
-        fig.add_vline(x=max_corr_lag, line_dash="dash")
+        fig.add_trace(go.Scatter(x=lags / fs, y=correlation, mode="lines", name="xcorr"))
+        fig.add_vline(x=max_corr_lag / fs, line_dash="dash")
 
         # Configure axes labels
         fig.update_xaxes(title_text="Lag (s) [positive = RED leads IR]")
@@ -1090,15 +1105,22 @@ class DataProcessor:
 
         try:
             start, end = int(window["start"]), int(window["end"])
-            df = read_window(path, [red_col, ir_col, waveform_col], start, end).dropna()
+            df = read_window(path, [red_col, ir_col, waveform_col], start, end)
+
+            # Vectorized conversion; unparseable cells (e.g. "n/a" in an uploaded
+            # CSV) become NaN and their rows are dropped along with missing values
+            red, ir, waveform = (
+                safe_float_array(df[col].to_numpy(), np.nan)
+                for col in (red_col, ir_col, waveform_col)
+            )
+            valid = ~(np.isnan(red) | np.isnan(ir) | np.isnan(waveform))
+            if not valid.all():
+                red, ir, waveform = red[valid], ir[valid], waveform[valid]
 
-            if df.empty:
+            n = len(red)
+            if n == 0:
                 return None, None, None, None, None, None, None, None
 
-            red = df[red_col].astype(float).to_numpy()
-            ir = df[ir_col].astype(float).to_numpy()
-            waveform = df[waveform_col].astype(float).to_numpy()
-            n = len(df)
             t = np.arange(n) / fs
 
             # Filter design & apply
@@ -1170,8 +1192,8 @@ class InsightGenerator:
             chips.append(html.Span(f"Filter error: {filt_err}", className="pill"))
 
         spo2, R, PI = estimate_spo2(red, ir, red_ac, ir_ac)
-        hr_psd = estimate_rates_psd(ir_ac, 100, (0.6, 3.5))
-        rr_psd = estimate_rates_psd(ir_ac, 100, (0.1, 0.5))
+        # Heart and respiratory rate are read off a single Welch PSD
+        hr_psd, rr_psd = estimate_rates_psd_batch(ir_ac, 100, [(0.6, 3.5), (0.1, 0.5)])[0]
         snr_red = quick_snr(red_ac)
         snr_ir = quick_snr(ir_ac)
         dc_red, dc_ir = float(np.mean(red)), float(np.mean(ir))
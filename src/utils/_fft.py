@@ -0,0 +1,43 @@
+"""
+Shared FFT backend for the signal processing utilities.
+
+``estimate_rates_psd`` (through ``scipy.signal.welch``) and
+``cross_correlation_lag`` transform windows of the same few sizes over and
+over. When pyFFTW is installed it is used as the ``scipy.fft`` backend with its
+plan cache enabled, so FFTW plans are built once per size and reused;
+otherwise SciPy's own pocketfft is used.
+"""
+
+import os
+from contextlib import contextmanager
+
+import scipy.fft
+
+try:
+    import pyfftw
+    import pyfftw.interfaces.scipy_fft as pyfftw_scipy_fft
+
+    pyfftw.interfaces.cache.enable()
+    # Keep cached plans for a while so interactive callbacks keep hitting them
+    pyfftw.interfaces.cache.set_keepalive_time(60)
+    pyfftw.config.NUM_THREADS = os.cpu_count() or 1
+
+    PYFFTW_AVAILABLE = True
+except ImportError:
+    PYFFTW_AVAILABLE = False
+
+
+@contextmanager
+def fft_backend():
+    """
+    Route ``scipy.fft`` calls in the block to pyFFTW (if available), using all cores.
+
+    SciPy code that calls ``scipy.fft`` internally, such as ``welch``, is covered
+    as well.
+    """
+    with scipy.fft.set_workers(-1):
+        if PYFFTW_AVAILABLE:
+            with scipy.fft.set_backend(pyfftw_scipy_fft):
+                yield
+        else:
+            yield
@@ -10,10 +10,18 @@ This module provides functions for efficient file operations including:
 """
 
 import base64
+import csv
+import mmap
+import os
+import re
+import shutil
 import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import BinaryIO, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from ..config.settings import settings
@@ -29,13 +37,45 @@ from .validation import (
     validate_file_size,
 )
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Chunk size (bytes) for newline counting in count_rows_quick
+_COUNT_CHUNK = 1 << 20
+
+# Block size (bytes) for the streaming PyArrow reader in read_window
+_ARROW_BLOCK_SIZE = 1 << 20
+
+# Windows starting before this row are read with pandas: skipping a short prefix
+# is cheaper than the Arrow reader's fixed start-up cost (~20 ms)
+_ARROW_MIN_START_ROW = 100_000
+
+# Base64 characters decoded per write (and buffer size in bytes for stream
+# uploads) in parse_uploaded_csv_to_temp; a multiple of 4 so every base64 chunk
+# decodes on its own
+_UPLOAD_CHUNK = 1 << 22
+
+_WHITESPACE = re.compile(r"\s")
+
+# get_auto_file_path results keyed by (filename, cwd) -> (searched directory mtimes, path),
+# least recently used first; Dash callbacks run in threads, hence the lock
+_AUTO_PATH_CACHE = OrderedDict()
+_AUTO_PATH_CACHE_SIZE = 256
+_AUTO_PATH_LOCK = threading.Lock()
+
 
 def count_rows_quick(path: str) -> int:
     """
     Quickly count rows in a CSV file without loading data into memory.
 
-    This function reads the file line by line to count rows, which is
-    much more memory-efficient than loading the entire file for large datasets.
+    Newlines are counted over a read-only memory map in 1 MiB NumPy chunks
+    (streamed reads for files that cannot be mapped), which avoids both loading
+    the data and iterating over it line by line in Python.
 
     Args:
         path: Path to the CSV file
@@ -53,8 +93,7 @@ def count_rows_quick(path: str) -> int:
         file_path = validate_file_path(path)
         validate_csv_file(file_path)
 
-        with open(file_path, "rb") as f:
-            total_lines = sum(1 for _ in f)
+        total_lines = _count_lines(file_path)
 
         return max(0, total_lines - 1)  # Account for header row
 
@@ -64,6 +103,29 @@ def count_rows_quick(path: str) -> int:
         raise PPGError(f"Failed to count rows in file: {e}", details={"path": path}) from e
 
 
+def _count_lines(file_path: Path) -> int:
+    """Count lines like ``sum(1 for _ in f)``: newlines plus an unterminated last line."""
+    with open(file_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty or non-mappable file: stream it instead
+            newlines, last = 0, b""
+            for chunk in iter(lambda: f.read(_COUNT_CHUNK), b""):
+                newlines += chunk.count(b"\n")
+                last = chunk[-1:]
+            return newlines + (last not in (b"", b"\n"))
+
+        with mm:
+            buf = np.frombuffer(mm, dtype=np.uint8)
+            newlines = 0
+            for start in range(0, buf.size, _COUNT_CHUNK):
+                newlines += int(np.count_nonzero(buf[start : start + _COUNT_CHUNK] == 0x0A))
+            unterminated = buf[-1] != 0x0A
+            del buf  # release the export before the map is closed
+            return newlines + int(unterminated)
+
+
 def get_columns_only(path: str) -> List[str]:
     """
     Get column names from a CSV file without loading data.
@@ -87,26 +149,43 @@ def get_columns_only(path: str) -> List[str]:
         file_path = validate_file_path(path)
         validate_csv_file(file_path)
 
-        # Read only header row
-        df_header = pd.read_csv(file_path, nrows=0)
-        return list(df_header.columns)
-
-    except (FileNotFoundError, InvalidFileFormatError):
+        # Read only the header line; utf-8-sig drops a BOM and blank leading
+        # lines are skipped, as pandas does
+        header = ""
+        with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+            for line in f:
+                if line.strip("\r\n"):
+                    header = line
+                    break
+        cols = next(csv.reader([header]), [])
+        if not cols:
+            raise PPGError("CSV file has no header row", details={"path": path})
+
+        # Blank or duplicate names are renamed by pandas ("Unnamed: 0", "a.1");
+        # defer to it so the names still match what read_window expects
+        if not all(cols) or len(set(cols)) != len(cols):
+            return list(pd.read_csv(file_path, nrows=0).columns)
+        return cols
+
+    except PPGError:
+        # Includes FileNotFoundError/InvalidFileFormatError and the empty-header error
         raise
     except Exception as e:
         raise PPGError(f"Failed to read columns from file: {e}", details={"path": path}) from e
 
 
-def parse_uploaded_csv_to_temp(contents: str, filename: str) -> str:
+def parse_uploaded_csv_to_temp(contents: Union[str, BinaryIO], filename: str) -> str:
     """
     Parse uploaded CSV content and save to temporary file.
 
     This function handles base64-encoded CSV content from web uploads
-    and creates a temporary file for processing. The temporary file
-    is automatically cleaned up by the system.
+    and creates a temporary file for processing. The payload is decoded
+    and written in chunks, so the decoded file is never held in memory.
+    The temporary file is automatically cleaned up by the system.
 
     Args:
-        contents: Base64 encoded CSV content with data URL prefix
+        contents: Base64 encoded CSV content with data URL prefix, or a binary
+            stream of raw CSV bytes
         filename: Original filename for determining file extension
 
     Returns:
@@ -120,13 +199,10 @@ def parse_uploaded_csv_to_temp(contents: str, filename: str) -> str:
         raise ValueError("Upload contents cannot be empty")
 
     try:
-        # Parse base64 content and decode
-        if "," not in contents:
+        is_stream = hasattr(contents, "read")
+        if not is_stream and "," not in contents:
             raise ValueError("Invalid upload content format")
 
-        content_type, content_string = contents.split(",", 1)
-        decoded = base64.b64decode(content_string)
-
         # Determine file extension
         suffix = ".csv" if not filename else f".{filename.split('.')[-1]}"
         if suffix.lower() != ".csv":
@@ -135,8 +211,16 @@ def parse_uploaded_csv_to_temp(contents: str, filename: str) -> str:
         # Create temporary file with configured prefix
         fd, tmp_path = tempfile.mkstemp(prefix=settings.temp_file_prefix, suffix=suffix)
 
-        with open(tmp_path, "wb") as f:
-            f.write(decoded)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if is_stream:
+                    shutil.copyfileobj(contents, f, length=_UPLOAD_CHUNK)
+                else:
+                    _write_base64(contents, contents.index(",") + 1, f)
+        except Exception:
+            # Malformed payload (e.g. bad base64 padding): don't leave the file behind
+            os.unlink(tmp_path)
+            raise
 
         return tmp_path
 
@@ -144,12 +228,24 @@ def parse_uploaded_csv_to_temp(contents: str, filename: str) -> str:
         raise PPGError(f"Failed to parse uploaded CSV: {e}") from e
 
 
+def _write_base64(contents: str, start: int, f: BinaryIO) -> None:
+    """Decode ``contents[start:]`` from base64 into ``f`` chunk by chunk."""
+    if _WHITESPACE.search(contents, start):
+        # Line-wrapped payloads don't split on 4-character boundaries
+        f.write(base64.b64decode(contents[start:]))
+        return
+    for i in range(start, len(contents), _UPLOAD_CHUNK):
+        f.write(base64.b64decode(contents[i : i + _UPLOAD_CHUNK]))
+
+
 def read_window(path: str, cols: List[str], start_row: int, end_row: int) -> pd.DataFrame:
     """
     Read a specific window of rows from a CSV file.
 
     This function efficiently reads only a subset of rows from a large CSV file,
-    making it suitable for handling datasets that don't fit in memory.
+    making it suitable for handling datasets that don't fit in memory. When
+    PyArrow is installed, windows deep into the file are streamed with its
+    multithreaded CSV reader; otherwise pandas is used.
 
     Args:
         path: Path to the CSV file
@@ -174,6 +270,15 @@ def read_window(path: str, cols: List[str], start_row: int, end_row: int) -> pd.
         if start_row < 0 or end_row <= start_row:
             raise ValueError("Invalid window parameters: start_row < 0 or end_row <= start_row")
 
+        if PYARROW_AVAILABLE and start_row >= _ARROW_MIN_START_ROW:
+            try:
+                return _read_window_arrow(file_path, cols, start_row, end_row - start_row)
+            except pa.ArrowInvalid:
+                # Arrow infers column types from the first block only; a column
+                # that changes type further on (e.g. ints, then decimals) is
+                # left to pandas, which infers over the whole window
+                pass
+
         # Read the specified window
         df = pd.read_csv(
             file_path,
@@ -193,10 +298,59 @@ def read_window(path: str, cols: List[str], start_row: int, end_row: int) -> pd.
         ) from e
 
 
+def _read_window_arrow(
+    file_path: Path, cols: List[str], start_row: int, nrows: int
+) -> pd.DataFrame:
+    """
+    Stream ``nrows`` rows of ``cols`` starting at data row ``start_row`` with PyArrow.
+
+    Rows before the window are skipped by the multithreaded Arrow reader without
+    being converted, only the requested columns are materialised, and reading
+    stops at the first block past the window instead of parsing the whole file.
+    Columns are returned in file order, as with pandas' ``usecols``, and
+    date/time-like columns stay strings, as pandas leaves them.
+    """
+
+    def open_reader(column_types=None):
+        return pa_csv.open_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(
+                use_threads=True, block_size=_ARROW_BLOCK_SIZE, skip_rows_after_names=start_row
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=cols, column_types=column_types
+            ),
+        )
+
+    reader = open_reader()
+    # Arrow infers timestamps/dates/times where pandas keeps the text; reopen with
+    # those columns pinned to strings so the dtype doesn't depend on the window
+    temporal = [f.name for f in reader.schema if pa.types.is_temporal(f.type)]
+    if temporal:
+        reader.close()
+        reader = open_reader({name: pa.string() for name in temporal})
+
+    batches, n = [], 0
+    for batch in reader:
+        batches.append(batch)
+        n += batch.num_rows
+        if n >= nrows:
+            break
+
+    table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, nrows)
+    wanted = set(cols)
+    return table.select([c for c in get_columns_only(str(file_path)) if c in wanted]).to_pandas()
+
+
 def get_auto_file_path(filename: str) -> Optional[str]:
     """
     Automatically detect and return the path to a file in the current directory.
 
+    Lookups of bare file names are cached per working directory (up to 256
+    entries); a cached result is reused until the modification time of one of
+    the searched directories changes (a file was added, removed or renamed
+    there). Names with a directory part are always looked up afresh.
+
     Args:
         filename: Name of the file to look for
 
@@ -204,22 +358,58 @@ def get_auto_file_path(filename: str) -> Optional[str]:
         Full path to the file if found, None otherwise
     """
     try:
-        # Look in current directory
-        current_dir = Path.cwd()
-        file_path = current_dir / filename
-
-        if file_path.exists():
-            return str(file_path.resolve())
-
-        # Look in parent directories (up to 3 levels)
-        for parent in current_dir.parents[:3]:
-            file_path = parent / filename
+        # Look in current directory, then parent directories (up to 3 levels)
+        cwd = os.getcwd()
+        search_dirs = [cwd]
+        for _ in range(3):
+            parent = os.path.dirname(search_dirs[-1])
+            if parent == search_dirs[-1]:
+                break
+            search_dirs.append(parent)
+
+        # For "sub/file.csv" or absolute paths the file can appear or vanish without
+        # any searched directory's mtime changing, so only bare names are cached
+        cacheable = os.path.basename(filename) == filename
+        key = (filename, cwd)
+        cached = None
+        if cacheable:
+            with _AUTO_PATH_LOCK:
+                cached = _AUTO_PATH_CACHE.get(key)
+                if cached is not None:
+                    _AUTO_PATH_CACHE.move_to_end(key)
+        if cached is not None:
+            mtimes, result = cached
+            if _dir_mtimes(search_dirs[: len(mtimes)]) == mtimes:
+                return result
+
+        # Snapshot mtimes before searching so a concurrent change invalidates the entry
+        mtimes = _dir_mtimes(search_dirs)
+        result = None
+        for i, directory in enumerate(search_dirs):
+            file_path = Path(directory) / filename
             if file_path.exists():
-                return str(file_path.resolve())
+                result = str(file_path.resolve())
+                if mtimes is not None:
+                    mtimes = mtimes[: i + 1]
+                break
+
+        if cacheable and mtimes is not None:
+            with _AUTO_PATH_LOCK:
+                _AUTO_PATH_CACHE[key] = (mtimes, result)
+                _AUTO_PATH_CACHE.move_to_end(key)
+                if len(_AUTO_PATH_CACHE) > _AUTO_PATH_CACHE_SIZE:
+                    _AUTO_PATH_CACHE.popitem(last=False)
+        return result
 
+    except Exception:
         return None
 
-    except Exception:
+
+def _dir_mtimes(dirs: List[str]) -> Optional[Tuple[int, ...]]:
+    """Modification times (ns) of ``dirs``, or None if one can't be stat'ed."""
+    try:
+        return tuple(os.stat(d).st_mtime_ns for d in dirs)
+    except OSError:
         return None
 
 
@@ -11,17 +11,83 @@ This module provides core signal processing functions including:
 - Cross-correlation analysis
 """
 
+import threading
+from functools import lru_cache
+
 import numpy as np
+from scipy.fft import irfft, next_fast_len, rfft
 from scipy.signal import (
     coherence,
     find_peaks,
     iirfilter,
     iirnotch,
+    sosfilt,
+    sosfilt_zi,
     sosfiltfilt,
     spectrogram,
     tf2sos,
     welch,
 )
+from scipy.signal.windows import hann
+
+from ..config.logging_config import get_logger
+from ._fft import fft_backend
+
+try:
+    import cupy as cp
+    from cupyx.scipy.signal import welch as cu_welch
+
+    CUPY_AVAILABLE = True
+    # Device-side failures that send estimate_rates_psd_batch back to the CPU
+    GPU_FALLBACK_ERRORS = (
+        cp.cuda.runtime.CUDARuntimeError,
+        cp.cuda.driver.CUDADriverError,
+        cp.cuda.memory.OutOfMemoryError,
+    )
+except ImportError:
+    CUPY_AVAILABLE = False
+    GPU_FALLBACK_ERRORS = ()
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit`` so kernels stay importable without numba."""
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+# Get logger for this module
+logger = get_logger(__name__)
+
+# Ripple/attenuation parameters used by each IIR family in design_base_filter
+_FAMILY_RIPPLE_PARAMS = {
+    "cheby1": ("rp",),
+    "cheby2": ("rs",),
+    "ellip": ("rp", "rs"),
+}
+
+# Per-stream filter state for online (single-pass) filtering in apply_chain,
+# keyed by (stream, stage) -> (sos_key, zi). Dash serves callbacks from several
+# threads, so every read-modify-write of the state holds _ONLINE_ZI_LOCK.
+_ONLINE_ZI = {}
+_ONLINE_ZI_LOCK = threading.Lock()
+
+# Minimum number of samples in a batch before the PSD is offloaded to the GPU;
+# below this the host/device transfers cost more than the FFTs themselves.
+GPU_PSD_MIN_SAMPLES = 1 << 20
+
+# Largest number of lags cross_correlation_lag evaluates directly (numba) rather
+# than via FFT; the direct O(L * lags) kernel wins below roughly 60-100 lags
+# for windows of 500-10k samples.
+XCORR_DIRECT_MAX_LAGS = 64
 
 
 def safe_float(x, fallback):
@@ -39,12 +105,49 @@ def safe_float(x, fallback):
     Returns:
         float: Converted value or fallback
     """
+    # Fast path: numeric inputs (the common case for slider values) cannot fail
+    if isinstance(x, (int, float, np.integer, np.floating)):
+        return float(x)
+
     try:
         return float(x)
     except Exception:
         return fallback
 
 
+def safe_float_array(values, fallback):
+    """
+    Convert a sequence of values to a float64 array, substituting a fallback.
+
+    Batched counterpart of ``safe_float`` for columns of user/uploaded data:
+    numeric input is converted in a single ``np.asarray`` call instead of one
+    Python call per element. Entries that cannot be converted, or that convert
+    to NaN, are replaced by ``fallback``.
+
+    Args:
+        values (array-like): Values to convert
+        fallback (float): Value used for unconvertible or NaN entries
+
+    Returns:
+        np.ndarray: 1-D (or input-shaped) float64 array
+    """
+    try:
+        arr = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Mixed/object input: fall back to per-element conversion
+        flat = np.asarray(values, dtype=object).ravel()
+        arr = np.fromiter(
+            (safe_float(v, np.nan) for v in flat), dtype=np.float64, count=flat.size
+        ).reshape(np.shape(values))
+    else:
+        if not np.isnan(arr).any():
+            return arr
+        arr = arr.copy()
+
+    arr[np.isnan(arr)] = fallback
+    return arr
+
+
 def safe_int(x, fallback):
     """
     Safely convert input to integer with fallback value.
@@ -60,6 +163,11 @@ def safe_int(x, fallback):
     Returns:
         int: Converted value or fallback
     """
+    # Fast path: integer inputs cannot fail (floats still go through the
+    # guarded path since NaN/inf raise on int())
+    if isinstance(x, (int, np.integer)):
+        return int(x)
+
     try:
         return int(x)
     except Exception:
@@ -91,7 +199,15 @@ def design_base_filter(fs, family, resp_type, low_hz, high_hz, order, rp, rs):
         - Frequencies are automatically constrained to prevent aliasing
         - For bandpass/bandstop, frequencies are automatically sorted
         - Filter parameters (rp, rs) are only used for relevant filter families
+        - Designs are memoized per parameter set; each call returns its own
+          writable copy of the cached coefficients
     """
+    return _design_base_filter_cached(fs, family, resp_type, low_hz, high_hz, order, rp, rs).copy()
+
+
+@lru_cache(maxsize=128)
+def _design_base_filter_cached(fs, family, resp_type, low_hz, high_hz, order, rp, rs):
+    """Memoized body of ``design_base_filter``; the cached SOS array is read-only."""
     fs = float(fs)
     nyq = fs / 2.0  # Nyquist frequency
 
@@ -110,17 +226,15 @@ def design_base_filter(fs, family, resp_type, low_hz, high_hz, order, rp, rs):
         lo = max(1e-6, min(lo, hi - 1e-6))  # Ensure valid band
         Wn = [lo, hi]
 
-    # Set up filter design parameters
+    # Set up filter design parameters (ripple specs only for families that use them)
     kwargs = dict(ftype=family, fs=fs, output="sos")
-    if family == "cheby1":
-        kwargs["rp"] = rp
-    elif family == "cheby2":
-        kwargs["rs"] = rs
-    elif family == "ellip":
-        kwargs["rp"] = rp
-        kwargs["rs"] = rs
+    ripple = {"rp": rp, "rs": rs}
+    for name in _FAMILY_RIPPLE_PARAMS.get(family, ()):
+        kwargs[name] = ripple[name]
 
-    return iirfilter(order, Wn, btype=resp_type, **kwargs)
+    sos = iirfilter(order, Wn, btype=resp_type, **kwargs)
+    sos.setflags(write=False)
+    return sos
 
 
 def apply_chain(
@@ -132,6 +246,10 @@ def apply_chain(
     notch_q=30.0,
     detrend_mean=False,
     invert=False,
+    online=False,
+    stream=None,
+    zero_phase=True,
+    dtype="auto",
 ):
     """
     Apply signal processing chain: detrend → filter → notch → invert.
@@ -151,6 +269,16 @@ def apply_chain(
         notch_q (float): Notch filter quality factor
         detrend_mean (bool): Whether to remove signal mean
         invert (bool): Whether to invert the signal
+        online (bool): Use single-pass ``sosfilt`` and carry the filter state over
+            to the next call with the same ``stream`` (for live/streaming views)
+        stream (hashable): Key identifying the stream whose filter state is carried
+            over; required when ``online`` is True. Use a distinct key per channel
+            and per session (e.g. ``(session_id, "red")``) so states never mix
+        zero_phase (bool): Filter forward-backward (``sosfiltfilt``). If False, a single
+            stateless ``sosfilt`` pass is used, at half the cost but with group delay
+        dtype (str or numpy.dtype): Working/output precision. ``"auto"`` keeps float32
+            input in float32 (half the memory traffic; ample for ADC-derived PPG data)
+            and uses float64 for everything else; pass ``np.float32`` to force it
 
     Returns:
         numpy.ndarray: Processed signal
@@ -159,30 +287,209 @@ def apply_chain(
         - All operations are applied in sequence
         - Notch filter is only applied if notch_enable is True
         - Base filter is only applied if base_sos is provided
+        - When no stage is enabled, input already in the working dtype is
+          returned without a copy
+        - The default zero-phase ``sosfiltfilt`` path should be kept for analysis
+          windows; the online path introduces the filter's group delay
     """
-    y = np.asarray(x, dtype=float)
+    if online and stream is None:
+        raise ValueError("apply_chain(online=True) requires a stream key")
 
-    # Step 1: Detrend (remove mean if requested)
-    if detrend_mean:
-        y = y - np.mean(y)
+    notch_active = notch_enable and notch_hz > 0
+    x = np.asarray(x)
+    if dtype == "auto":
+        dtype = np.float32 if x.dtype == np.float32 else np.float64
 
-    # Step 2: Apply base filter if provided
-    if base_sos is not None:
-        y = sosfiltfilt(base_sos, y)
+    # Fast path: nothing to do, hand back the input as a float array (no copy)
+    if base_sos is None and not notch_active and not detrend_mean and not invert:
+        return np.asarray(x, dtype=dtype)
 
-    # Step 3: Apply notch filter if enabled
-    if notch_enable and notch_hz > 0:
-        b, a = iirnotch(w0=notch_hz, Q=notch_q, fs=fs)
-        sos_notch = tf2sos(b, a)
-        y = sosfiltfilt(sos_notch, y)
+    y = np.ascontiguousarray(x, dtype=dtype)
 
-    # Step 4: Invert signal if requested
+    stages = []
+    if base_sos is not None:
+        stages.append(("base", base_sos))
+    if notch_active:
+        b, a = iirnotch(w0=notch_hz, Q=notch_q, fs=fs)
+        stages.append(("notch", tf2sos(b, a)))
+
+    # Steps 1-3: detrend, base filter, notch. Mean removal and inversion are affine
+    # and the zero-phase filter is linear, so both are folded into the first
+    # stage's edge extension instead of taking their own passes over the signal
+    offset = np.mean(y) if detrend_mean else 0
+    if stages and zero_phase and not online:
+        sos = np.array(stages.pop(0)[1], dtype=y.dtype)
+        y = _sosfiltfilt(sos, y, offset, -1 if invert else 1)
+        invert = False
+    elif detrend_mean:
+        y = y - offset
+
+    for stage, sos in stages:
+        y = _run_sos(sos, y, zero_phase, online, stream, stage)
+
+    # Step 4: Invert signal if requested (and not already folded in)
     if invert:
         y = -y
 
+    # SciPy stages may have promoted to float64 through their float64 state
+    return y.astype(dtype, copy=False)
+
+
+def _run_sos(sos, y, zero_phase, online, stream, stage):
+    """Dispatch one SOS stage of apply_chain to the online, zero-phase or one-pass filter."""
+    # Coefficients follow the working precision of the signal; always copy, since
+    # SciPy's sosfilt rejects read-only coefficient buffers
+    sos = np.array(sos, dtype=y.dtype)
+    if online:
+        return _online_sosfilt(sos, y, stream, stage)
+    if zero_phase:
+        return _sosfiltfilt(sos, y)
+    if _use_sos_kernels(sos, y):
+        return _sos_cascade_jit(sos, y, np.zeros((sos.shape[0], 2), dtype=y.dtype))
+    return sosfilt(sos, y)
+
+
+def _use_sos_kernels(sos, y):
+    """Whether the numba SOS kernels can stand in for SciPy for this filter/input."""
+    sos = np.asarray(sos)
+    return (
+        NUMBA_AVAILABLE
+        and y.ndim == 1
+        and sos.ndim == 2
+        and sos.shape[1] == 6
+        and bool(np.all(sos[:, 3] == 1.0))
+    )
+
+
+def _sos_cascade_jit(sos, x, zi, reverse=False):
+    """Run an SOS cascade with the numba kernels (fused ``_biquad2`` for 2 sections)."""
+    if sos.shape[0] == 2:
+        return _biquad2(x, sos[0], sos[1], zi, reverse)
+    return _sos_cascade(x, sos, zi, reverse)
+
+
+def _sosfiltfilt(sos, y, offset=0, gain=1):
+    """
+    Zero-phase SOS filtering of ``gain * (y - offset)``, using numba kernels when available.
+
+    Two-section filters (e.g. the default 4th-order Butterworth bandpass) are by
+    far the most common configuration and run through ``_biquad2`` with the state
+    held in scalars; other section counts use the generic ``_sos_cascade``.
+    The numba path builds the offset/scaled edge extension in one pass and runs
+    the backward filter in place of reversed copies. Without numba (or for
+    unsupported inputs) SciPy's ``sosfiltfilt`` is used.
+    """
+    if not _use_sos_kernels(sos, y):
+        if offset or gain != 1:
+            y = gain * (y - offset)
+        return sosfiltfilt(sos, y)
+
+    # Mirror scipy.signal.sosfiltfilt: odd extension of 3 * ntaps samples per edge
+    ntaps = 2 * sos.shape[0] + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+    edge = 3 * ntaps
+    if len(y) <= edge:
+        return sosfiltfilt(sos, y)  # let SciPy raise its usual error
+
+    ext = _odd_ext(y, edge, offset, gain)
+    zi = sosfilt_zi(sos).astype(y.dtype)
+
+    fwd = _sos_cascade_jit(sos, ext, zi * ext[0])
+    bwd = _sos_cascade_jit(sos, fwd, zi * fwd[-1], True)
+    return bwd[edge:-edge]
+
+
+@njit(fastmath=True, cache=True)
+def _odd_ext(x, edge, offset, gain):
+    """``gain * (x - offset)`` with ``edge`` samples of odd extension at both ends."""
+    n = x.shape[0]
+    ext = np.empty(n + 2 * edge, dtype=x.dtype)
+    first, last = x[0], x[n - 1]
+    for i in range(edge):
+        ext[i] = gain * (2 * first - x[edge - i] - offset)
+        ext[n + edge + i] = gain * (2 * last - x[n - 2 - i] - offset)
+    for i in range(n):
+        ext[edge + i] = gain * (x[i] - offset)
+    return ext
+
+
+@njit(fastmath=True, cache=True)
+def _biquad2(x, c0, c1, zi, reverse=False):
+    """Run two cascaded DF-II transposed biquads over ``x`` (back to front if ``reverse``)."""
+    b00, b01, b02, a01, a02 = c0[0], c0[1], c0[2], c0[4], c0[5]
+    b10, b11, b12, a11, a12 = c1[0], c1[1], c1[2], c1[4], c1[5]
+    z00, z01 = zi[0, 0], zi[0, 1]
+    z10, z11 = zi[1, 0], zi[1, 1]
+
+    n = x.shape[0]
+    y = np.empty_like(x)
+    for j in range(n):
+        i = n - 1 - j if reverse else j
+        xi = x[i]
+        s0 = b00 * xi + z00
+        z00 = b01 * xi - a01 * s0 + z01
+        z01 = b02 * xi - a02 * s0
+        s1 = b10 * s0 + z10
+        z10 = b11 * s0 - a11 * s1 + z11
+        z11 = b12 * s0 - a12 * s1
+        y[i] = s1
     return y
 
 
+@njit(fastmath=True, cache=True)
+def _sos_cascade(x, sos, zi, reverse=False):
+    """Run an arbitrary DF-II transposed SOS cascade over ``x`` (back to front if ``reverse``)."""
+    n_sections = sos.shape[0]
+    z = zi.copy()
+
+    n = x.shape[0]
+    y = np.empty_like(x)
+    for j in range(n):
+        i = n - 1 - j if reverse else j
+        v = x[i]
+        for k in range(n_sections):
+            out = sos[k, 0] * v + z[k, 0]
+            z[k, 0] = sos[k, 1] * v - sos[k, 4] * out + z[k, 1]
+            z[k, 1] = sos[k, 2] * v - sos[k, 5] * out
+            v = out
+        y[i] = v
+    return y
+
+
+def _online_sosfilt(sos, y, stream, stage):
+    """Single-pass SOS filtering that resumes from the stream's previous state."""
+    sos = np.asarray(sos, dtype=float)
+    sos_key = sos.tobytes()
+    key = (stream, stage)
+
+    with _ONLINE_ZI_LOCK:
+        cached = _ONLINE_ZI.get(key)
+        if cached is not None and cached[0] == sos_key:
+            zi = cached[1]
+        else:
+            # New stream or filter changed: start from the steady state of the first sample
+            zi = sosfilt_zi(sos) * (y[0] if len(y) else 0.0)
+
+        y, zf = sosfilt(sos, y, zi=zi)
+        _ONLINE_ZI[key] = (sos_key, zf)
+    return y
+
+
+def reset_online_state(stream=None):
+    """
+    Drop carried-over filter state used by ``apply_chain(..., online=True)``.
+
+    Args:
+        stream (hashable, optional): Stream to reset. Resets every stream if None.
+    """
+    with _ONLINE_ZI_LOCK:
+        if stream is None:
+            _ONLINE_ZI.clear()
+            return
+
+        for key in [k for k in _ONLINE_ZI if k[0] == stream]:
+            del _ONLINE_ZI[key]
+
+
 def estimate_rates_psd(sig, fs, band_tuple):
     """
     Estimate rate from PSD peak in specified frequency band.
@@ -205,18 +512,121 @@ def estimate_rates_psd(sig, fs, band_tuple):
         - Returns rate in units per minute (60 * frequency)
     """
     # Calculate power spectral density using Welch's method
-    f, Pxx = welch(sig, fs=fs, nperseg=min(len(sig), 2048))
+    nperseg = min(len(sig), 2048)
+    # Segment FFTs are spread over all cores; nfft is padded to a fast length so an
+    # awkward (e.g. prime) window never hits pocketfft's slow path
+    with fft_backend():
+        f, Pxx = welch(
+            sig,
+            fs=fs,
+            window=_hann_window(nperseg),
+            nperseg=nperseg,
+            nfft=next_fast_len(nperseg, real=True),
+        )
+    return _band_peak_rate(f, Pxx, band_tuple)
+
+
+def estimate_rates_psd_batch(sigs, fs, band_tuple):
+    """
+    Estimate rates for a batch of equal-length signals in one Welch call.
+
+    Multi-channel or multi-window requests are stacked into a 2-D array of
+    shape (channels, samples) so the PSD is computed in a single batched
+    call instead of one call per signal, and several bands (e.g. heart and
+    respiratory rate) are read off the same PSD. When CuPy is installed and
+    the batch holds at least ``GPU_PSD_MIN_SAMPLES`` samples, the Welch
+    estimate runs on the GPU; if the device fails (no usable CUDA device,
+    out of memory) a warning is logged and SciPy is used instead.
+
+    Args:
+        sigs (array-like): Signal, or 2-D array of signals with one signal per row
+        fs (float): Sampling frequency in Hz
+        band_tuple (tuple): (low_freq, high_freq) frequency band in Hz, or a
+            sequence of such bands
+
+    Returns:
+        list: Estimated rate per row in units per minute (None where estimation
+        fails); for a sequence of bands, a list of per-band rates per row
+    """
+    sigs = np.atleast_2d(np.asarray(sigs, dtype=float))
+    nperseg = min(sigs.shape[-1], 2048)
+    multi_band = np.ndim(band_tuple) == 2
+    bands = list(band_tuple) if multi_band else [band_tuple]
+
+    rates = None
+    if CUPY_AVAILABLE and sigs.size >= GPU_PSD_MIN_SAMPLES:
+        try:
+            rates = _estimate_rates_psd_gpu(sigs, fs, bands, nperseg)
+        except GPU_FALLBACK_ERRORS as e:
+            logger.warning(f"GPU PSD failed, falling back to CPU: {e}")
+
+    if rates is None:
+        rates = _estimate_rates_psd_cpu(sigs, fs, bands, nperseg)
+    return rates if multi_band else [row[0] for row in rates]
+
+
+def _estimate_rates_psd_cpu(sigs, fs, bands, nperseg):
+    """Batched Welch PSD peak search with SciPy; one list of per-band rates per row."""
+    with fft_backend():
+        f, Pxx = welch(
+            sigs,
+            fs=fs,
+            window=_hann_window(nperseg),
+            nperseg=nperseg,
+            nfft=next_fast_len(nperseg, real=True),
+            axis=-1,
+        )
+    return [[_band_peak_rate(f, P, band) for band in bands] for P in Pxx]
+
+
+@lru_cache(maxsize=8)
+def _hann_window(n):
+    """Periodic Hann window of length ``n`` (welch's default), cached read-only."""
+    w = hann(n, sym=False)
+    w.setflags(write=False)
+    return w
+
+
+def _estimate_rates_psd_gpu(sigs, fs, bands, nperseg):
+    """Batched Welch PSD peak search on the GPU via CuPy; one list of per-band rates per row."""
+    f, Pxx = cu_welch(
+        cp.asarray(sigs), fs=fs, nperseg=nperseg, nfft=next_fast_len(nperseg, real=True), axis=-1
+    )
+
+    per_band = []
+    for lo, hi in bands:
+        # Slice the band on-device and only transfer the peak frequencies back
+        i0 = int(cp.searchsorted(f, lo, side="left"))
+        i1 = int(cp.searchsorted(f, hi, side="right"))
+        if i0 >= i1:
+            per_band.append([None] * sigs.shape[0])
+            continue
+
+        f_band = f[i0:i1]
+        P_band = Pxx[:, i0:i1]
+        valid = cp.asnumpy(~cp.all(cp.isnan(P_band), axis=-1))
+        P_band = cp.where(cp.isnan(P_band), -cp.inf, P_band)
+        f_peak = cp.asnumpy(f_band[cp.argmax(P_band, axis=-1)])
+        per_band.append([60.0 * float(fp) if ok else None for fp, ok in zip(f_peak, valid)])
+
+    return [list(row) for row in zip(*per_band)]
+
+
+def _band_peak_rate(f, Pxx, band_tuple):
+    """Return 60 x the frequency of the PSD peak inside ``band_tuple``, or None."""
     lo, hi = band_tuple
 
-    # Find frequencies within the specified band
-    mask = (f >= lo) & (f <= hi)
+    # Locate the band edges in the (ascending) frequency grid; slicing gives
+    # views instead of materialising a boolean mask the size of f
+    i0 = np.searchsorted(f, lo, side="left")
+    i1 = np.searchsorted(f, hi, side="right")
 
-    if not np.any(mask):
+    if i0 >= i1:
         return None
 
     # Extract power values within the band
-    f_band = f[mask]
-    P_band = Pxx[mask]
+    f_band = f[i0:i1]
+    P_band = Pxx[i0:i1]
 
     # Check for valid power values
     if len(P_band) == 0 or np.all(np.isnan(P_band)):
@@ -264,37 +674,106 @@ def auto_decimation(n, decim_user, traces, cap):
     target_per = max(1, cap // max(traces, 1))
     d = max(1, int(decim_user))
 
-    if n // d > target_per:
-        d = int(np.ceil(n / target_per))
-
-    return max(1, d)
+    # Integer ceil-division keeps this in pure int arithmetic (no float/np.ceil)
+    return d if n // d <= target_per else -(-n // target_per)
 
 
-def cross_correlation_lag(sig1, sig2, max_lag=None):
+def cross_correlation_lag(sig1, sig2, max_lag=None, interpolate=False):
     """
     Compute cross-correlation between two signals and find the lag.
 
+    The signals are mean-removed and the correlation is normalised by
+    ``sqrt(sum(sig1**2) * sum(sig2**2))`` so values lie in [-1, 1]. Lags follow
+    ``np.correlate(sig1, sig2, "full")``: ``corr[k] = sum_n sig1[n + lags[k]] * sig2[n]``.
+    The correlation is computed with a zero-padded real FFT in O(L log L) and
+    only lags within ``max_lag`` are returned.
+
     Args:
         sig1 (np.ndarray): First signal
         sig2 (np.ndarray): Second signal
-        max_lag (int, optional): Maximum lag to compute. Defaults to None.
+        max_lag (int, optional): Maximum lag in samples. Defaults to a quarter of
+            the shorter signal.
+        interpolate (bool): Refine ``max_corr_lag`` to sub-sample resolution by
+            fitting a parabola through the peak and its two neighbours. The
+            returned lag is then a float.
 
     Returns:
         tuple: (lags, correlation, max_corr_lag)
     """
+    x = np.asarray(sig1, dtype=float)
+    y = np.asarray(sig2, dtype=float)
     if max_lag is None:
-        max_lag = min(len(sig1), len(sig2)) // 4
+        max_lag = min(len(x), len(y)) // 4
+    max_lag = max(0, int(max_lag))
+
+    lo = min(max_lag, len(y) - 1)
+    hi = min(max_lag, len(x) - 1)
+    lags = np.arange(-lo, hi + 1)
+
+    x = x - x.mean()
+    y = y - y.mean()
+    if NUMBA_AVAILABLE and lags.size <= XCORR_DIRECT_MAX_LAGS:
+        # Only a few lags requested: evaluating them directly beats the FFT
+        correlation = _xcorr_direct(x, y, lo, hi)
+    else:
+        correlation = _xcorr_fft(x, y, lo, hi)
 
-    correlation = np.correlate(sig1, sig2, mode="full")
-    lags = np.arange(-len(sig2) + 1, len(sig1))
+    denom = np.sqrt(np.dot(x, x) * np.dot(y, y))
+    if denom > 0:
+        correlation /= denom
 
     # Find the lag with maximum correlation
     max_corr_idx = np.argmax(np.abs(correlation))
     max_corr_lag = lags[max_corr_idx]
 
+    if interpolate:
+        max_corr_lag = float(max_corr_lag)
+        if 0 < max_corr_idx < len(correlation) - 1:
+            # 3-point parabolic fit on |corr| (sign-flipped for negative peaks)
+            c0, c1, c2 = correlation[max_corr_idx - 1 : max_corr_idx + 2] * np.sign(
+                correlation[max_corr_idx]
+            )
+            curvature = c0 - 2 * c1 + c2
+            if curvature < 0:
+                max_corr_lag += 0.5 * (c0 - c2) / curvature
+
     return lags, correlation, max_corr_lag
 
 
+def _xcorr_fft(x, y, lo, hi):
+    """
+    Raw cross-correlation of ``x`` and ``y`` for lags ``-lo..hi`` via a real FFT.
+
+    The transform runs in float32 (half the memory traffic on long windows; the
+    ~1e-6 relative error is irrelevant for lag picking) on a ``next_fast_len``
+    size that avoids circular wrap-around.
+    """
+    n = next_fast_len(len(x) + len(y) - 1, real=True)
+    with fft_backend():
+        X = rfft(x.astype(np.float32), n)
+        Y = rfft(y.astype(np.float32), n)
+        X *= np.conj(Y)
+        r = irfft(X, n)
+    # Negative lags wrap to the end of the circular result
+    return np.concatenate((r[n - lo :], r[: hi + 1])).astype(float)
+
+
+@njit(fastmath=True, cache=True, boundscheck=False)
+def _xcorr_direct(x, y, lo, hi):
+    """Raw cross-correlation for lags ``-lo..hi`` evaluated in the time domain, O(L * lags)."""
+    nx, ny = x.shape[0], y.shape[0]
+    out = np.empty(lo + hi + 1)
+    for k in range(lo + hi + 1):
+        tau = k - lo
+        start = max(0, -tau)
+        stop = min(ny, nx - tau)
+        acc = 0.0
+        for i in range(start, stop):
+            acc += x[i + tau] * y[i]
+        out[k] = acc
+    return out
+
+
 def analyze_waveform(signal, fs, window_s=5.0, annotations=None):
     """
     Analyze waveform characteristics including peaks, valleys, and zero crossings.
@@ -3,9 +3,12 @@ Pytest configuration and fixtures for the PPG analysis tool tests.
 """
 
 import os
+import shutil
 import sys
 import tempfile
+from collections import namedtuple
 from pathlib import Path
+from types import SimpleNamespace
 
 import numpy as np
 import pytest
@@ -14,6 +17,49 @@ import pytest
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Keep pytest's temporary directories on tmpfs (``/dev/shm``) when it is available."""
+    # xdist workers inherit the controller's basetemp; an explicit --basetemp wins
+    if config.option.basetemp or hasattr(config, "workerinput") or not os.path.isdir("/dev/shm"):
+        return
+    basetemp = tempfile.mkdtemp(prefix="ppg-pytest-", dir="/dev/shm")
+    config.option.basetemp = basetemp
+    config.add_cleanup(lambda: shutil.rmtree(basetemp, ignore_errors=True))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    Mark every test that is not an integration test as a unit test.
+
+    Under xdist (``--dist=loadgroup``) each test is also put in an ``xdist_group``:
+    its module, so module-scoped data is built once per worker, except that every
+    test using the session ``plot_figures`` shares one group so the figures are
+    only rendered on a single worker. Runs first so xdist's own hook sees the groups.
+    """
+    xdist = config.pluginmanager.hasplugin("xdist")
+    for item in items:
+        if item.get_closest_marker("integration") is None:
+            item.add_marker(pytest.mark.unit)
+        if xdist:
+            group = "plot_figures" if "plot_figures" in item.fixturenames else item.path.stem
+            item.add_marker(pytest.mark.xdist_group(group))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def warm_up_jit():
+    """Compile (or load from cache) the numba SOS kernels once before any test runs."""
+    from src.utils.signal_processing import NUMBA_AVAILABLE, apply_chain, design_base_filter
+
+    if NUMBA_AVAILABLE:
+        x = np.zeros(64)
+        for order in (2, 3):
+            sos = design_base_filter(100, "butter", "bandpass", 0.5, 5.0, order, 1.0, 40.0)
+            apply_chain(x, 100, base_sos=sos)
+            apply_chain(x, 100, base_sos=sos, zero_phase=False)
+
+
 @pytest.fixture
 def sample_ppg_data():
     """Generate sample PPG data for testing."""
@@ -40,26 +86,171 @@ def sample_ppg_data():
 
 
 @pytest.fixture
-def temp_csv_file():
+def temp_csv_file(tmp_path):
     """Create a temporary CSV file for testing."""
-    temp_file = tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False)
-    temp_file.write("time,red,ir\n")
-
     # Add some test data
-    for i in range(100):
-        t = i / 100.0
-        red_val = 1000 + 100 * np.sin(2 * np.pi * 1.2 * t)
-        ir_val = 800 + 80 * np.cos(2 * np.pi * 1.2 * t)
-        temp_file.write(f"{t:.3f},{red_val:.1f},{ir_val:.1f}\n")
+    t = np.arange(100) / 100.0
+    red_val = 1000 + 100 * np.sin(2 * np.pi * 1.2 * t)
+    ir_val = 800 + 80 * np.cos(2 * np.pi * 1.2 * t)
+
+    temp_path = tmp_path / "test.csv"
+    np.savetxt(
+        temp_path,
+        np.column_stack([t, red_val, ir_val]),
+        fmt=["%.3f", "%.1f", "%.1f"],
+        delimiter=",",
+        header="time,red,ir",
+        comments="",
+    )
+    return str(temp_path)
+
+
+@pytest.fixture
+def upload_tmpdir(tmp_path, monkeypatch):
+    """Point ``tempfile``'s default directory (used for upload temp files) at ``tmp_path``."""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def ppg_n():
+    """Number of samples in the synthetic integration recording (2.56 s at 100 Hz)."""
+    return 256
+
+
+@pytest.fixture(scope="session")
+def ppg_csv(tmp_path_factory, ppg_n):
+    """
+    Write a synthetic RED/IR PPG recording to CSV once per test session.
+
+    The file is shared by every test in the session and must be treated as read-only.
+    """
+    rng = np.random.default_rng(0)
+    fs = 100
+
+    # Heart rate around 72 bpm (1.2 Hz) sampled at 100 Hz
+    t = np.linspace(0, ppg_n / fs, ppg_n)
+    red_base = 1000 + 100 * np.sin(2 * np.pi * 1.2 * t)
+    ir_base = 800 + 80 * np.cos(2 * np.pi * 1.2 * t)
+
+    # Add some noise
+    red_noise = red_base + 20 * rng.standard_normal(ppg_n)
+    ir_noise = ir_base + 15 * rng.standard_normal(ppg_n)
+
+    path = tmp_path_factory.mktemp("ppg") / "ppg.csv"
+    np.savetxt(
+        path,
+        np.column_stack([t, red_noise, ir_noise]),
+        fmt=["%.3f", "%.1f", "%.1f"],
+        delimiter=",",
+        header="time,red,ir",
+        comments="",
+    )
+
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def ppg_signals(ppg_csv, ppg_n):
+    """
+    RED/IR columns of ``ppg_csv``, parsed once per session through ``read_window``.
+
+    Returns a dict of read-only float64 arrays keyed by column name.
+    """
+    from src.utils.file_utils import read_window
+
+    df = read_window(ppg_csv, ["red", "ir"], 0, ppg_n)
+    signals = {}
+    for col in ("red", "ir"):
+        arr = df[col].astype(float).to_numpy()
+        arr.setflags(write=False)
+        signals[col] = arr
+
+    return signals
+
+
+@pytest.fixture(scope="session")
+def bandpass_sos():
+    """Default 0.5-5 Hz Butterworth bandpass SOS for 100 Hz data, designed once per session."""
+    from src.utils.signal_processing import design_base_filter
+
+    sos = design_base_filter(100, "butter", "bandpass", 0.5, 5.0, 2, 1.0, 40.0)
+    sos.setflags(write=False)
+    return sos
+
+
+PlotFigures = namedtuple("PlotFigures", "time_domain frequency dynamics dual_source")
+
+
+@pytest.fixture(scope="session")
+def plot_signals():
+    """Read-only 1.2 Hz RED/IR test signals (10 s at 100 Hz) shared by the plot tests."""
+    t = np.linspace(0, 10, 1000)
+    # Evaluate the phase once and scale in place to avoid per-expression temporaries
+    phase = t * (2 * np.pi * 1.2)
+    red_ac = np.sin(phase)
+    red_ac *= 100
+    ir_ac = np.cos(phase, out=phase)
+    ir_ac *= 80
+    red = red_ac + 1000
+    ir = ir_ac + 800
+
+    for arr in (t, red, ir, red_ac, ir_ac):
+        arr.setflags(write=False)
+    return SimpleNamespace(fs=100, t=t, red=red, ir=ir, red_ac=red_ac, ir_ac=ir_ac)
+
+
+@pytest.fixture(scope="session")
+def plot_manager():
+    """PlotManager shared across the session (its create_* methods are stateless)."""
+    from src.callbacks.plot_callbacks import PlotManager
+
+    return PlotManager("plotly", "light")
+
+
+@pytest.fixture(scope="session")
+def plot_figures(plot_manager, plot_signals):
+    """
+    Every figure group built from ``plot_signals`` once per session.
+
+    The figures are shared, so tests must only inspect them.
+    """
+    sig = plot_signals
+    return PlotFigures(
+        time_domain=plot_manager.create_time_domain_plots(
+            sig.t,
+            sig.red,
+            sig.ir,
+            sig.red,  # waveform (using red as waveform for testing)
+            sig.red_ac,
+            sig.ir_ac,
+            sig.red_ac,  # waveform_ac
+            "RED",
+            "IR",
+            "WAVEFORM",
+            "butter",
+            "bandpass",
+            2,
+            len(sig.t),
+        ),
+        frequency=plot_manager.create_frequency_plots(
+            sig.red_ac, sig.ir_ac, sig.fs, 2.0, 0.5, ["on"]
+        ),
+        dynamics=plot_manager.create_dynamics_plots(
+            sig.red_ac, sig.ir_ac, sig.fs, "ir", 40, 180, 0.5, ["hr"]
+        ),
+        dual_source=plot_manager.create_dual_source_plots(
+            sig.red, sig.ir, sig.red_ac, sig.ir_ac, sig.fs, sig.t
+        ),
+    )
 
-    temp_file.close()
-    temp_path = temp_file.name
 
-    yield temp_path
+@pytest.fixture(scope="session")
+def dash_app():
+    """Create the Dash application once per test session."""
+    from src.app import create_app
 
-    # Cleanup
-    if os.path.exists(temp_path):
-        os.unlink(temp_path)
+    return create_app()
 
 
 @pytest.fixture
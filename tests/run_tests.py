@@ -2,121 +2,34 @@
 """
 Test runner for the PPG analysis tool.
 
-This script runs all unit tests and provides a summary of results.
+The suite is pytest-native (module fixtures live in ``tests/conftest.py``), so this
+script is a thin wrapper around ``pytest.main`` that keeps the old entry point working.
 """
 
-import os
 import sys
-import unittest
 from pathlib import Path
 
-# Add the src directory to the Python path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import pytest
 
+TESTS_DIR = Path(__file__).parent
+ROOT_DIR = TESTS_DIR.parent
 
-def run_all_tests():
-    """Run all tests and return the test suite."""
-    # Discover all test files
-    test_dir = Path(__file__).parent
-    loader = unittest.TestLoader()
 
-    # Load tests from each test file
-    test_suite = unittest.TestSuite()
+def main(argv=None):
+    """Main test runner function.
 
-    # Configuration tests
-    try:
-        from tests.test_config import TestConfigSettings
+    Args:
+        argv (list, optional): Extra pytest arguments (defaults to ``sys.argv[1:]``)
 
-        test_suite.addTests(loader.loadTestsFromTestCase(TestConfigSettings))
-        print("✓ Loaded configuration tests")
-    except ImportError as e:
-        print(f"✗ Failed to load configuration tests: {e}")
-
-    # Utility tests
-    try:
-        from tests.test_utils import TestFileUtils, TestSignalProcessing
-
-        test_suite.addTests(loader.loadTestsFromTestCase(TestSignalProcessing))
-        test_suite.addTests(loader.loadTestsFromTestCase(TestFileUtils))
-        print("✓ Loaded utility tests")
-    except ImportError as e:
-        print(f"✗ Failed to load utility tests: {e}")
-
-    # PPG analysis tests
-    try:
-        from tests.test_ppg_analysis import TestPPGAnalysis
-
-        test_suite.addTests(loader.loadTestsFromTestCase(TestPPGAnalysis))
-        print("✓ Loaded PPG analysis tests")
-    except ImportError as e:
-        print(f"✗ Failed to load PPG analysis tests: {e}")
-
-    # Callback tests
-    try:
-        from tests.test_callbacks import TestDataCallbacks, TestPlotCallbacks, TestWindowCallbacks
-
-        test_suite.addTests(loader.loadTestsFromTestCase(TestPlotCallbacks))
-        test_suite.addTests(loader.loadTestsFromTestCase(TestDataCallbacks))
-        test_suite.addTests(loader.loadTestsFromTestCase(TestWindowCallbacks))
-        print("✓ Loaded callback tests")
-    except ImportError as e:
-        print(f"✗ Failed to load callback tests: {e}")
-
-    # Integration tests
-    try:
-        from tests.test_integration import TestApplicationIntegration, TestDataValidation
-
-        test_suite.addTests(loader.loadTestsFromTestCase(TestApplicationIntegration))
-        test_suite.addTests(loader.loadTestsFromTestCase(TestDataValidation))
-        print("✓ Loaded integration tests")
-    except ImportError as e:
-        print(f"✗ Failed to load integration tests: {e}")
-
-    return test_suite
-
-
-def main():
-    """Main test runner function."""
+    Returns:
+        int: pytest exit code
+    """
     print("PPG Analysis Tool - Test Suite")
     print("=" * 40)
 
-    # Run tests
-    test_suite = run_all_tests()
-
-    if test_suite.countTestCases() == 0:
-        print("\nNo tests found!")
-        return 1
-
-    print(f"\nRunning {test_suite.countTestCases()} tests...")
-    print("-" * 40)
-
-    # Run tests with verbose output
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(test_suite)
-
-    # Print summary
-    print("\n" + "=" * 40)
-    print("TEST SUMMARY")
-    print("=" * 40)
-    print(f"Tests run: {result.testsRun}")
-    print(f"Failures: {len(result.failures)}")
-    print(f"Errors: {len(result.errors)}")
-    print(
-        f"Success rate: {((result.testsRun - len(result.failures) - len(result.errors)) / result.testsRun * 100):.1f}%"
-    )
-
-    if result.failures:
-        print("\nFAILURES:")
-        for test, traceback in result.failures:
-            print(f"  {test}: {traceback.split('AssertionError:')[-1].strip()}")
-
-    if result.errors:
-        print("\nERRORS:")
-        for test, traceback in result.errors:
-            print(f"  {test}: {traceback.split('Exception:')[-1].strip()}")
-
-    # Return appropriate exit code
-    return 0 if result.wasSuccessful() else 1
+    args = list(sys.argv[1:] if argv is None else argv)
+    # Run from the project root so pyproject.toml's pytest settings apply
+    return int(pytest.main(["--rootdir", str(ROOT_DIR), str(TESTS_DIR), *args]))
 
 
 if __name__ == "__main__":
@@ -2,189 +2,129 @@
 Integration tests for the complete PPG analysis application.
 """
 
-import os
-import tempfile
-import unittest
-from pathlib import Path
-
 import numpy as np
-import pandas as pd
+import pytest
 
-from src.app import create_app
 from src.utils.file_utils import read_window
 from src.utils.ppg_analysis import compute_hr_trend, estimate_spo2
 from src.utils.signal_processing import apply_chain, design_base_filter
 
 
-class TestApplicationIntegration(unittest.TestCase):
-    """Test the complete application integration."""
-
-    def setUp(self):
-        """Set up test data and application."""
-        # Create test CSV file
-        self.temp_file = tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False)
-        self.temp_file.write("time,red,ir\n")
-
-        # Generate realistic PPG-like data
-        fs = 100
-        t = np.linspace(0, 10, 1000)
-
-        # Base signals with heart rate around 72 bpm (1.2 Hz)
-        red_base = 1000 + 100 * np.sin(2 * np.pi * 1.2 * t)
-        ir_base = 800 + 80 * np.cos(2 * np.pi * 1.2 * t)
-
-        # Add some noise
-        red_noise = red_base + 20 * np.random.randn(1000)
-        ir_noise = ir_base + 15 * np.random.randn(1000)
-
-        for i, (tr, rr, ir) in enumerate(zip(t, red_noise, ir_noise)):
-            self.temp_file.write(f"{tr:.3f},{rr:.1f},{ir:.1f}\n")
-
-        self.temp_file.close()
-        self.temp_path = self.temp_file.name
-
-        # Create application instance
-        self.app = create_app()
-
-    def tearDown(self):
-        """Clean up test files."""
-        if os.path.exists(self.temp_path):
-            os.unlink(self.temp_path)
-
-    def test_complete_data_processing_pipeline(self):
-        """Test the complete data processing pipeline."""
-        # 1. Read data
-        df = read_window(self.temp_path, ["red", "ir"], 0, 1000)
-        self.assertEqual(len(df), 1000)
-        self.assertIn("red", df.columns)
-        self.assertIn("ir", df.columns)
-
-        # 2. Extract signals
-        red = df["red"].astype(float).to_numpy()
-        ir = df["ir"].astype(float).to_numpy()
-        fs = 100
-
-        # 3. Design and apply filter
-        sos = design_base_filter(fs, "butter", "bandpass", 0.5, 5.0, 2, 1.0, 40.0)
-        red_ac = apply_chain(red, fs, base_sos=sos, detrend_mean=True)
-        ir_ac = apply_chain(ir, fs, base_sos=sos, detrend_mean=True)
-
-        # 4. Compute heart rate
-        t_peaks, ibis, (hr_t, hr_bpm) = compute_hr_trend(red_ac, fs, hr_min=40, hr_max=180)
-
-        if len(hr_bpm) > 0:
-            # HR should be reasonable (around 72 bpm)
-            mean_hr = np.mean(hr_bpm)
-            self.assertGreater(mean_hr, 60)
-            self.assertLess(mean_hr, 90)
-
-        # 5. Estimate SpO2
-        spo2, R, PI = estimate_spo2(red, ir, red_ac, ir_ac)
-
-        if spo2 is not None:
-            # SpO2 should be in a reasonable range for synthetic data
-            # Real PPG data typically gives 95-100%, but synthetic data may be lower
-            self.assertGreaterEqual(spo2, 70)  # Lowered threshold for synthetic data
-            self.assertLessEqual(spo2, 100)
-            self.assertGreater(R, 0)
-            self.assertGreater(PI, 0)
-
-    def test_signal_quality_metrics(self):
-        """Test signal quality metrics computation."""
-        # Read and process data
-        df = read_window(self.temp_path, ["red", "ir"], 0, 1000)
-        red = df["red"].astype(float).to_numpy()
-        ir = df["ir"].astype(float).to_numpy()
-        fs = 100
-
-        # Apply filtering
-        sos = design_base_filter(fs, "butter", "bandpass", 0.5, 5.0, 2, 1.0, 40.0)
-        red_ac = apply_chain(red, fs, base_sos=sos)
-        ir_ac = apply_chain(ir, fs, base_sos=sos)
-
-        # Test signal characteristics
-        # DC levels should be reasonable
-        dc_red = np.mean(red)
-        dc_ir = np.mean(ir)
-        self.assertGreater(dc_red, 800)
-        self.assertLess(dc_red, 1200)
-        self.assertGreater(dc_ir, 600)
-        self.assertLess(dc_ir, 1000)
-
-        # AC amplitudes should be reasonable
-        ac_red = np.ptp(red_ac)
-        ac_ir = np.ptp(ir_ac)
-        self.assertGreater(ac_red, 50)
-        self.assertLess(ac_red, 500)
-        self.assertGreater(ac_ir, 30)
-        self.assertLess(ac_ir, 400)
-
-    def test_filter_performance(self):
-        """Test filter performance on different signal types."""
-        fs = 100
-        t = np.linspace(0, 1, 1000)
-
-        # Test signal with multiple frequencies
-        x = (
-            np.sin(2 * np.pi * 1 * t)  # 1 Hz (60 bpm)
-            + 0.5 * np.sin(2 * np.pi * 5 * t)  # 5 Hz (300 bpm)
-            + 0.3 * np.sin(2 * np.pi * 0.1 * t)
-        )  # 0.1 Hz (6 bpm)
-
-        # Design bandpass filter for heart rate (0.5-3 Hz)
-        sos = design_base_filter(fs, "butter", "bandpass", 0.5, 3.0, 4, 1.0, 40.0)
-        y = apply_chain(x, fs, base_sos=sos)
-
-        # Filtered signal should have reduced power at unwanted frequencies
-        # This is a basic test - in practice you'd use FFT to verify
-        self.assertEqual(len(y), len(x))
-        self.assertLess(np.std(y), np.std(x))  # Filtering should reduce variance
-
-    def test_application_creation(self):
-        """Test that the application can be created successfully."""
-        app = create_app()
-        self.assertIsNotNone(app)
-
-        # Check that the app has the expected layout
-        self.assertIsNotNone(app.layout)
-
-        # Check that callbacks are registered
-        # This is a basic check - in practice you'd verify specific callbacks
-        self.assertTrue(hasattr(app, "callback_map"))
-
-
-class TestDataValidation(unittest.TestCase):
-    """Test data validation and error handling."""
-
-    def test_empty_data_handling(self):
-        """Test handling of empty or invalid data."""
-        # Create empty CSV
-        temp_file = tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False)
-        temp_file.write("time,red,ir\n")
-        temp_file.close()
-
-        try:
-            # Try to read empty data
-            df = read_window(temp_file.name, ["red", "ir"], 0, 10)
-            self.assertEqual(len(df), 0)
-        finally:
-            os.unlink(temp_file.name)
-
-    def test_missing_columns(self):
-        """Test handling of missing columns."""
-        # Create CSV with missing columns
-        temp_file = tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False)
-        temp_file.write("time,red\n")  # Missing 'ir' column
-        temp_file.write("0.0,1000\n")
-        temp_file.close()
-
-        try:
-            # This should raise an error or handle gracefully
-            with self.assertRaises(Exception):
-                df = read_window(temp_file.name, ["red", "ir"], 0, 10)
-        finally:
-            os.unlink(temp_file.name)
-
-
-if __name__ == "__main__":
-    unittest.main()
+@pytest.mark.integration
+@pytest.mark.slow
+def test_complete_data_processing_pipeline(ppg_signals, ppg_n, bandpass_sos):
+    """Test the complete data processing pipeline."""
+    # 1-2. Signals read from the CSV (once per session) via read_window
+    red = ppg_signals["red"]
+    ir = ppg_signals["ir"]
+    assert len(red) == ppg_n
+    assert len(ir) == ppg_n
+    fs = 100
+
+    # 3. Apply the shared bandpass filter
+    red_ac = apply_chain(red, fs, base_sos=bandpass_sos, detrend_mean=True)
+    ir_ac = apply_chain(ir, fs, base_sos=bandpass_sos, detrend_mean=True)
+
+    # 4. Compute heart rate
+    t_peaks, ibis, (hr_t, hr_bpm) = compute_hr_trend(red_ac, fs, hr_min=40, hr_max=180)
+
+    # The fixture is seeded, so beats must be found and HR must be close to 72 bpm
+    assert len(hr_bpm) > 0
+    mean_hr = np.mean(hr_bpm)
+    assert 65 < mean_hr < 80
+
+    # 5. Estimate SpO2
+    spo2, R, PI = estimate_spo2(red, ir, red_ac, ir_ac)
+
+    # SpO2 should be in a reasonable range for synthetic data
+    # Real PPG data typically gives 95-100%, but synthetic data may be lower
+    assert spo2 is not None
+    assert spo2 >= 70  # Lowered threshold for synthetic data
+    assert spo2 <= 100
+    assert R > 0
+    assert PI > 0
+
+
+@pytest.mark.integration
+def test_signal_quality_metrics(ppg_signals, bandpass_sos):
+    """Test signal quality metrics computation."""
+    red = ppg_signals["red"]
+    ir = ppg_signals["ir"]
+    fs = 100
+
+    # Apply filtering (zero-phase: a single pass leaves a start-up transient from the
+    # ~1000 DC level that would dominate the peak-to-peak AC checks below)
+    red_ac = apply_chain(red, fs, base_sos=bandpass_sos)
+    ir_ac = apply_chain(ir, fs, base_sos=bandpass_sos)
+
+    # Test signal characteristics
+    # DC levels should be reasonable
+    dc_red = np.mean(red)
+    dc_ir = np.mean(ir)
+    assert 800 < dc_red < 1200
+    assert 600 < dc_ir < 1000
+
+    # AC amplitudes should be reasonable
+    ac_red = np.ptp(red_ac)
+    ac_ir = np.ptp(ir_ac)
+    assert 50 < ac_red < 500
+    assert 30 < ac_ir < 400
+
+
+@pytest.mark.integration
+def test_filter_performance():
+    """Test filter performance on different signal types."""
+    fs = 100
+    t = np.linspace(0, 1, 256)
+
+    # Test signal with multiple frequencies
+    x = (
+        np.sin(2 * np.pi * 1 * t)  # 1 Hz (60 bpm)
+        + 0.5 * np.sin(2 * np.pi * 5 * t)  # 5 Hz (300 bpm)
+        + 0.3 * np.sin(2 * np.pi * 0.1 * t)
+    )  # 0.1 Hz (6 bpm)
+
+    # Design bandpass filter for heart rate (0.5-3 Hz)
+    # Only the variance is asserted, so a single (non zero-phase) pass is enough
+    sos = design_base_filter(fs, "butter", "bandpass", 0.5, 3.0, 4, 1.0, 40.0)
+    y = apply_chain(x, fs, base_sos=sos, zero_phase=False)
+
+    # Filtered signal should have reduced power at unwanted frequencies
+    # This is a basic test - in practice you'd use FFT to verify
+    assert len(y) == len(x)
+    assert np.std(y) < np.std(x)  # Filtering should reduce variance
+
+
+@pytest.mark.integration
+def test_application_creation(dash_app):
+    """Test that the application can be created successfully."""
+    assert dash_app is not None
+
+    # Check that the app has the expected layout
+    assert dash_app.layout is not None
+
+    # Check that callbacks are registered
+    # This is a basic check - in practice you'd verify specific callbacks
+    assert hasattr(dash_app, "callback_map")
+
+
+def test_empty_data_handling(tmp_path):
+    """Test handling of empty or invalid data."""
+    # Create empty CSV (header only)
+    path = tmp_path / "empty.csv"
+    path.write_text("time,red,ir\n")
+
+    # Try to read empty data
+    df = read_window(str(path), ["red", "ir"], 0, 10)
+    assert len(df) == 0
+
+
+def test_missing_columns(tmp_path):
+    """Test handling of missing columns."""
+    # Create CSV with missing columns
+    path = tmp_path / "missing.csv"
+    path.write_text("time,red\n0.0,1000\n")  # Missing 'ir' column
+
+    # This should raise an error or handle gracefully
+    with pytest.raises(Exception):
+        read_window(str(path), ["red", "ir"], 0, 10)
@@ -2,9 +2,10 @@
 Unit tests for PPG analysis functions.
 """
 
-import unittest
+import functools
 
 import numpy as np
+import pytest
 
 from src.utils.ppg_analysis import (
     avg_beat,
@@ -18,173 +19,213 @@ from src.utils.ppg_analysis import (
     sdppg,
 )
 
-
-class TestPPGAnalysis(unittest.TestCase):
-    """Test PPG analysis functions."""
-
-    def test_robust_absorbance(self):
-        """Test robust absorbance calculation."""
-        # Test with positive values
-        x = np.array([100, 200, 300, 400, 500])
-        a = robust_absorbance(x)
-        self.assertEqual(len(a), len(x))
-        self.assertTrue(np.all(np.isfinite(a)))
-
-        # Test with zeros (should handle gracefully)
-        x_zero = np.array([0, 100, 200])
-        a_zero = robust_absorbance(x_zero)
-        self.assertEqual(len(a_zero), len(x_zero))
-        self.assertTrue(np.all(np.isfinite(a_zero)))
-
-    def test_beats_from_peaks(self):
-        """Test beat segmentation from peaks."""
-        # Create test signal with known peaks
-        fs = 100
-        t_peaks = np.array([0.5, 1.5, 2.5, 3.5])  # 1 second intervals
-
-        beats = beats_from_peaks(np.random.randn(400), fs, t_peaks)
-        self.assertEqual(len(beats), len(t_peaks))
-
-        # Each beat should have (start, peak, end) indices
-        for beat in beats:
-            self.assertEqual(len(beat), 3)
-            start, peak, end = beat
-            self.assertLessEqual(start, peak)
-            self.assertLessEqual(peak, end)
-
-    def test_beat_ac_dc(self):
-        """Test beat AC/DC analysis."""
-        # Create test data
-        fs = 100
-        signal_raw = 1000 + 100 * np.sin(2 * np.pi * 1 * np.linspace(0, 4, 400))
-        signal_ac = 100 * np.sin(2 * np.pi * 1 * np.linspace(0, 4, 400))
-        beats = [(50, 100, 150), (250, 300, 350)]
-
-        t_mid, ac, dc = beat_ac_dc(signal_raw, signal_ac, beats, fs)
-        self.assertEqual(len(t_mid), len(beats))
-        self.assertEqual(len(ac), len(beats))
-        self.assertEqual(len(dc), len(beats))
-
-        # AC should be positive (peak-to-trough)
-        self.assertTrue(np.all(ac > 0))
-        # DC should be around 1000
-        self.assertTrue(np.all(dc > 900))
-
-    def test_r_series_spo2(self):
-        """Test R-ratio and SpO2 calculation."""
-        # Create test data
-        fs = 100
-        red_raw = 1000 + 100 * np.sin(2 * np.pi * 1 * np.linspace(0, 2, 200))
-        ir_raw = 800 + 80 * np.cos(2 * np.pi * 1 * np.linspace(0, 2, 200))
-        red_ac = 100 * np.sin(2 * np.pi * 1 * np.linspace(0, 2, 200))
-        ir_ac = 80 * np.cos(2 * np.pi * 1 * np.linspace(0, 2, 200))
-        t_peaks = np.array([0.5, 1.5])
-
-        tB, R, spo2 = r_series_spo2(red_raw, ir_raw, red_ac, ir_ac, t_peaks, fs)
-
-        if len(tB) > 0:
-            self.assertEqual(len(tB), len(R))
-            self.assertEqual(len(R), len(spo2))
-            # R should be positive
-            self.assertTrue(np.all(R > 0))
-            # SpO2 should be reasonable (80-100%)
-            self.assertTrue(np.all((spo2 >= 80) & (spo2 <= 100)))
-
-    def test_avg_beat(self):
-        """Test ensemble-averaged beat calculation."""
-        # Create test signal with peaks
-        fs = 100
-        signal = np.sin(2 * np.pi * 1 * np.linspace(0, 4, 400))
-        t_peaks = np.array([0.5, 1.5, 2.5, 3.5])
-
-        t_rel, mean, std = avg_beat(signal, t_peaks, fs, width_s=1.0, out_len=100)
-
-        if len(t_rel) > 0:
-            self.assertEqual(len(t_rel), 100)
-            self.assertEqual(len(mean), 100)
-            self.assertEqual(len(std), 100)
-            # Time should be centered around 0
-            self.assertAlmostEqual(t_rel[0], -0.5, places=1)
-            self.assertAlmostEqual(t_rel[-1], 0.5, places=1)
-
-    def test_ms_coherence(self):
-        """Test magnitude-squared coherence."""
-        # Create test signals
-        fs = 100
-        t = np.linspace(0, 10, 1000)
-        # Correlated signals
-        x = np.sin(2 * np.pi * 2 * t) + 0.1 * np.random.randn(1000)
-        y = np.sin(2 * np.pi * 2 * t + np.pi / 4) + 0.1 * np.random.randn(1000)
-
-        f, C = ms_coherence(x, y, fs)
-        self.assertEqual(len(f), len(C))
-        # Coherence should be between 0 and 1, but may contain NaN/inf values
-        # Filter out NaN and inf values before checking bounds
-        C_valid = C[np.isfinite(C)]
-        if len(C_valid) > 0:
-            # Allow for small numerical errors that might push values slightly outside [0,1]
-            self.assertTrue(np.all((C_valid >= -1e-10) & (C_valid <= 1 + 1e-10)))
-
-    def test_estimate_spo2(self):
-        """Test SpO2 estimation."""
-        # Create test data
-        red_raw = np.full(1000, 1000)
-        ir_raw = np.full(1000, 800)
-        red_ac = 100 * np.sin(2 * np.pi * 1 * np.linspace(0, 10, 1000))
-        ir_ac = 80 * np.cos(2 * np.pi * 1 * np.linspace(0, 10, 1000))
-
-        spo2, R, PI = estimate_spo2(red_raw, ir_raw, red_ac, ir_ac)
-
-        if spo2 is not None:
-            self.assertIsInstance(spo2, float)
-            self.assertIsInstance(R, float)
-            self.assertIsInstance(PI, float)
-            # SpO2 should be reasonable
-            self.assertGreaterEqual(spo2, 80)
-            self.assertLessEqual(spo2, 100)
-            # R should be positive
-            self.assertGreater(R, 0)
-            # PI should be positive
-            self.assertGreater(PI, 0)
-
-    def test_compute_hr_trend(self):
-        """Test heart rate trend computation."""
-        # Create test signal with known frequency
-        fs = 100
-        t = np.linspace(0, 10, 1000)
-        # Signal with 1.2 Hz component (72 bpm) - make it more prominent
-        signal = np.sin(2 * np.pi * 1.2 * t) + 0.05 * np.random.randn(1000)
-
-        # Add some baseline to make peaks more detectable
-        signal = signal + 1.0
-
-        t_peaks, ibis, (hr_t, hr_bpm) = compute_hr_trend(signal, fs, hr_min=40, hr_max=180)
-
-        if len(hr_t) > 0:
-            self.assertEqual(len(hr_t), len(hr_bpm))
-            # HR should be in a reasonable range for synthetic data
-            # Allow for wider range due to noise and peak detection variability
-            # The test signal is 1.2 Hz = 72 bpm, so allow some tolerance
-            self.assertTrue(np.all((hr_bpm >= 30) & (hr_bpm <= 150)))
-            # IBI should be reasonable (0.5-2 seconds)
-            if len(ibis) > 0:
-                self.assertTrue(np.all((ibis >= 0.3) & (ibis <= 3.0)))
-
-    def test_sdppg(self):
-        """Test second derivative PPG."""
-        # Create test signal
-        t = np.linspace(0, 1, 1000)
-        x = np.sin(2 * np.pi * 10 * t)
-
-        sd = sdppg(x)
-        self.assertEqual(len(sd), len(x))
-        # Second derivative should have more zero crossings
-        zero_crossings_orig = np.sum(np.diff(np.sign(x)) != 0)
-        zero_crossings_sd = np.sum(np.diff(np.sign(sd)) != 0)
-        # For a simple sine wave, the second derivative should have more zero crossings
-        # But this may not always be true due to numerical precision
-        self.assertGreaterEqual(zero_crossings_sd, zero_crossings_orig - 2)  # Allow some tolerance
-
-
-if __name__ == "__main__":
-    unittest.main()
+# Shared read-only time grid
+T_0_1_1K = np.linspace(0, 1, 1000)
+T_0_1_1K.setflags(write=False)
+
+
+def _readonly(*arrays):
+    """Mark arrays read-only so cached inputs can be shared safely between tests."""
+    for arr in arrays:
+        arr.setflags(write=False)
+    return arrays
+
+
+@functools.lru_cache(maxsize=None)
+def _sine_pair(fs, dur, f):
+    """Cached read-only ``(t, sin, cos)`` of an ``f`` Hz tone, ``dur`` seconds at ``fs``."""
+    t = np.linspace(0, dur, int(fs * dur))
+    phase = 2 * np.pi * f * t
+    return _readonly(t, np.sin(phase), np.cos(phase))
+
+
+@functools.lru_cache(maxsize=None)
+def _noisy_sine(fs, dur, f, seed, noise=0.1, phase=0.0):
+    """Cached read-only ``sin(2*pi*f*t + phase)`` plus seeded Gaussian noise."""
+    t = _sine_pair(fs, dur, f)[0]
+    eps = np.random.default_rng(seed).standard_normal(len(t))
+    x = np.sin(2 * np.pi * f * t + phase) + noise * eps
+    return _readonly(x)[0]
+
+
+def _zc(x):
+    """Count sign changes between consecutive samples."""
+    return np.count_nonzero(np.signbit(x[1:]) ^ np.signbit(x[:-1]))
+
+
+def test_robust_absorbance():
+    """Test robust absorbance calculation."""
+    # Test with positive values
+    x = np.array([100, 200, 300, 400, 500])
+    a = robust_absorbance(x)
+    assert len(a) == len(x)
+    assert np.all(np.isfinite(a))
+
+    # Test with zeros (should handle gracefully)
+    x_zero = np.array([0, 100, 200])
+    a_zero = robust_absorbance(x_zero)
+    assert len(a_zero) == len(x_zero)
+    assert np.all(np.isfinite(a_zero))
+
+
+def test_beats_from_peaks():
+    """Test beat segmentation from peaks."""
+    # Create test signal with known peaks
+    fs = 100
+    t_peaks = np.array([0.5, 1.5, 2.5, 3.5])  # 1 second intervals
+
+    beats = beats_from_peaks(np.random.default_rng(0).standard_normal(400), fs, t_peaks)
+    assert len(beats) == len(t_peaks)
+
+    # Each beat should have (start, peak, end) indices
+    for beat in beats:
+        assert len(beat) == 3
+        start, peak, end = beat
+        assert start <= peak
+        assert peak <= end
+
+
+def test_beat_ac_dc():
+    """Test beat AC/DC analysis."""
+    # Create test data
+    fs = 100
+    # One sine evaluation (cached) shared by the AC and raw signals
+    signal_ac = 100 * _sine_pair(fs, 4, 1)[1]
+    signal_raw = signal_ac + 1000
+    beats = [(50, 100, 150), (250, 300, 350)]
+
+    t_mid, ac, dc = beat_ac_dc(signal_raw, signal_ac, beats, fs)
+    assert len(t_mid) == len(beats)
+    assert len(ac) == len(beats)
+    assert len(dc) == len(beats)
+
+    # AC should be positive (peak-to-trough)
+    np.testing.assert_array_less(0, ac)
+    # DC should be around 1000
+    np.testing.assert_array_less(900, dc)
+
+
+def test_r_series_spo2():
+    """Test R-ratio and SpO2 calculation."""
+    # Create test data
+    fs = 100
+    # sin/cos evaluated once on a shared phase
+    _, s, c = _sine_pair(fs, 2, 1)
+    red_ac = 100 * s
+    ir_ac = 80 * c
+    red_raw = red_ac + 1000
+    ir_raw = ir_ac + 800
+    t_peaks = np.array([0.5, 1.5])
+
+    tB, R, spo2 = r_series_spo2(red_raw, ir_raw, red_ac, ir_ac, t_peaks, fs)
+
+    if len(tB) > 0:
+        assert len(tB) == len(R)
+        assert len(R) == len(spo2)
+        # R should be positive
+        np.testing.assert_array_less(0, R)
+        # SpO2 should be reasonable (80-100%)
+        np.testing.assert_array_less(80 - 1e-12, spo2)
+        np.testing.assert_array_less(spo2, 100 + 1e-12)
+
+
+def test_avg_beat():
+    """Test ensemble-averaged beat calculation."""
+    # Create test signal with peaks
+    fs = 100
+    signal = np.sin(2 * np.pi * 1 * np.linspace(0, 4, 400))
+    t_peaks = np.array([0.5, 1.5, 2.5, 3.5])
+
+    t_rel, mean, std = avg_beat(signal, t_peaks, fs, width_s=1.0, out_len=100)
+
+    if len(t_rel) > 0:
+        assert len(t_rel) == 100
+        assert len(mean) == 100
+        assert len(std) == 100
+        # Time should be centered around 0
+        assert t_rel[0] == pytest.approx(-0.5, abs=0.5e-1)
+        assert t_rel[-1] == pytest.approx(0.5, abs=0.5e-1)
+
+
+def test_ms_coherence():
+    """Test magnitude-squared coherence."""
+    # Create test signals
+    fs = 100
+    # Correlated signals
+    x = _noisy_sine(fs, 10, 2, seed=0)
+    y = _noisy_sine(fs, 10, 2, seed=1, phase=np.pi / 4)
+
+    f, C = ms_coherence(x, y, fs)
+    assert len(f) == len(C)
+    # Coherence should be between 0 and 1, but may contain NaN/inf values
+    # Filter out NaN and inf values before checking bounds
+    C_valid = C[np.isfinite(C)]
+    if len(C_valid) > 0:
+        # Allow for small numerical errors that might push values slightly outside [0,1]
+        np.testing.assert_array_less(-1e-10 - 1e-12, C_valid)
+        np.testing.assert_array_less(C_valid, 1 + 1e-10 + 1e-12)
+
+
+def test_estimate_spo2():
+    """Test SpO2 estimation."""
+    # Create test data
+    # Constant DC baselines as zero-copy broadcast views (estimate_spo2 only reads them)
+    red_raw = np.broadcast_to(np.int64(1000), (1000,))
+    ir_raw = np.broadcast_to(np.int64(800), (1000,))
+    _, s, c = _sine_pair(100, 10, 1)
+    red_ac = 100 * s
+    ir_ac = 80 * c
+
+    spo2, R, PI = estimate_spo2(red_raw, ir_raw, red_ac, ir_ac)
+
+    if spo2 is not None:
+        assert isinstance(spo2, float)
+        assert isinstance(R, float)
+        assert isinstance(PI, float)
+        # SpO2 should be reasonable
+        assert spo2 >= 80
+        assert spo2 <= 100
+        # R should be positive
+        assert R > 0
+        # PI should be positive
+        assert PI > 0
+
+
+def test_compute_hr_trend():
+    """Test heart rate trend computation."""
+    # Create test signal with known frequency
+    fs = 100
+    # Signal with 1.2 Hz component (72 bpm) - make it more prominent
+    signal = _noisy_sine(fs, 10, 1.2, seed=0, noise=0.05)
+
+    # Add some baseline to make peaks more detectable
+    signal = signal + 1.0
+
+    t_peaks, ibis, (hr_t, hr_bpm) = compute_hr_trend(signal, fs, hr_min=40, hr_max=180)
+
+    if len(hr_t) > 0:
+        assert len(hr_t) == len(hr_bpm)
+        # HR should be in a reasonable range for synthetic data
+        # Allow for wider range due to noise and peak detection variability
+        # The test signal is 1.2 Hz = 72 bpm, so allow some tolerance
+        np.testing.assert_array_less(30 - 1e-12, hr_bpm)
+        np.testing.assert_array_less(hr_bpm, 150 + 1e-12)
+        # IBI should be reasonable (0.5-2 seconds)
+        if len(ibis) > 0:
+            np.testing.assert_array_less(0.3 - 1e-12, ibis)
+            np.testing.assert_array_less(ibis, 3.0 + 1e-12)
+
+
+def test_sdppg():
+    """Test second derivative PPG."""
+    # Create test signal
+    x = np.sin(2 * np.pi * 10 * T_0_1_1K)
+
+    sd = sdppg(x)
+    assert len(sd) == len(x)
+    # Second derivative should have more zero crossings
+    zero_crossings_orig = _zc(x)
+    zero_crossings_sd = _zc(sd)
+    # For a simple sine wave, the second derivative should have more zero crossings
+    # But this may not always be true due to numerical precision
+    assert zero_crossings_sd >= zero_crossings_orig - 2  # Allow some tolerance
@@ -2,176 +2,68 @@
 Tests for the refactored plot callbacks.
 """
 
-import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import DEFAULT, patch
 
 import numpy as np
+import pytest
 
 # Import the refactored classes
-from src.callbacks.plot_callbacks import DataProcessor, InsightGenerator, PlotManager
-
-
-class TestPlotManager(unittest.TestCase):
-    """Test the PlotManager class."""
-
-    def setUp(self):
-        """Set up test data."""
-        self.plot_mgr = PlotManager("plotly", "light")
-        self.t = np.linspace(0, 10, 1000)
-        self.red = 1000 + 100 * np.sin(2 * np.pi * 1.2 * self.t)
-        self.ir = 800 + 80 * np.cos(2 * np.pi * 1.2 * self.t)
-        self.red_ac = 100 * np.sin(2 * np.pi * 1.2 * self.t)
-        self.ir_ac = 80 * np.cos(2 * np.pi * 1.2 * self.t)
-
-        # Verify types
-        self.assertIsInstance(len(self.t), int)
-        self.assertEqual(len(self.t), 1000)
-
-    def test_init(self):
-        """Test PlotManager initialization."""
-        self.assertEqual(self.plot_mgr.template, "plotly")
-        self.assertEqual(self.plot_mgr.theme, "light")
-        self.assertIsInstance(self.plot_mgr.colors, dict)
-
-    def test_create_blank_figure(self):
-        """Test blank figure creation."""
-        fig = self.plot_mgr.create_blank_figure(300)
-        self.assertEqual(fig.layout.height, 300)
-        # Check that the template is set (the actual template object, not the string name)
-        self.assertIsNotNone(fig.layout.template)
-
-    def test_create_time_domain_plots(self):
-        """Test time domain plot creation."""
-        # Ensure n is an integer
-        n_value = int(len(self.t))
-
-        fig_raw, fig_ac = self.plot_mgr.create_time_domain_plots(
-            self.t,  # t
-            self.red,  # red
-            self.ir,  # ir
-            self.red,  # waveform (using red as waveform for testing)
-            self.red_ac,  # red_ac
-            self.ir_ac,  # ir_ac
-            self.red_ac,  # waveform_ac (using red_ac as waveform_ac for testing)
-            "RED",  # red_col
-            "IR",  # ir_col
-            "WAVEFORM",  # waveform_col
-            "butter",  # family
-            "bandpass",  # resp
-            2,  # order
-            n_value,  # n
+from src.callbacks.plot_callbacks import DataProcessor, InsightGenerator
+
+# Shared read-only payload for mocked read_window/apply_chain results
+_PAYLOAD_100 = np.random.default_rng(0).standard_normal(100)
+_PAYLOAD_100.setflags(write=False)
+
+# One read-only 4x1000 draw sliced into the channel views used by InsightGenerator tests
+_BLOCK = np.random.default_rng(0).standard_normal((4, 1000))
+_BLOCK.setflags(write=False)
+RED, IR, RED_AC, IR_AC = _BLOCK
+
+
+def test_init(plot_manager):
+    """Test PlotManager initialization."""
+    assert plot_manager.template == "plotly"
+    assert plot_manager.theme == "light"
+    assert isinstance(plot_manager.colors, dict)
+
+
+def test_create_blank_figure(plot_manager):
+    """Test blank figure creation."""
+    fig = plot_manager.create_blank_figure(300)
+    assert fig.layout.height == 300
+    # Check that the template is set (the actual template object, not the string name)
+    assert fig.layout.template is not None
+
+
+def test_process_data_valid():
+    """Test data processing with valid data."""
+    # Mock data
+    path = "/test/path.csv"
+    window = {"start": 0, "end": 100}
+    red_col = "red"
+    ir_col = "ir"
+
+    # Create a simple pandas-like DataFrame mock
+    import pandas as pd
+
+    with patch.multiple(
+        "src.callbacks.plot_callbacks",
+        read_window=DEFAULT,
+        design_base_filter=DEFAULT,
+        apply_chain=DEFAULT,
+    ) as mocks:
+        mocks["read_window"].return_value = pd.DataFrame(
+            {"red": _PAYLOAD_100, "ir": _PAYLOAD_100, "waveform": _PAYLOAD_100}
         )
+        mocks["design_base_filter"].return_value = np.array([[1, 0, 1]])
+        mocks["apply_chain"].return_value = _PAYLOAD_100
 
-        self.assertIsNotNone(fig_raw)
-        self.assertIsNotNone(fig_ac)
-        self.assertEqual(fig_raw.layout.height, 600)  # Updated height
-        self.assertEqual(fig_ac.layout.height, 600)  # Updated height
-
-    def test_create_frequency_plots(self):
-        """Test frequency plot creation."""
-        fig_psd, fig_spec = self.plot_mgr.create_frequency_plots(
-            self.red_ac, self.ir_ac, 100, 2.0, 0.5, ["on"]
-        )
-
-        self.assertIsNotNone(fig_psd)
-        self.assertIsNotNone(fig_spec)
-        self.assertEqual(fig_psd.layout.height, 360)
-        self.assertEqual(fig_spec.layout.height, 380)
-
-    def test_create_dynamics_plots(self):
-        """Test dynamics plot creation."""
-        fig_hr, fig_hist, fig_poi, fig_xc = self.plot_mgr.create_dynamics_plots(
-            self.red_ac, self.ir_ac, 100, "ir", 40, 180, 0.5, ["hr"]
-        )
-
-        self.assertIsNotNone(fig_hr)
-        self.assertIsNotNone(fig_hist)
-        self.assertIsNotNone(fig_poi)
-        self.assertIsNotNone(fig_xc)
-
-    def test_create_dual_source_plots(self):
-        """Test dual source plot creation."""
-        fig_rtrend, fig_coh, fig_liss, fig_avgbeat, fig_sdppg = (
-            self.plot_mgr.create_dual_source_plots(
-                self.red, self.ir, self.red_ac, self.ir_ac, 100, self.t
-            )
-        )
-
-        self.assertIsNotNone(fig_rtrend)
-        self.assertIsNotNone(fig_coh)
-        self.assertIsNotNone(fig_liss)
-        self.assertIsNotNone(fig_avgbeat)
-        self.assertIsNotNone(fig_sdppg)
-
-
-class TestDataProcessor(unittest.TestCase):
-    """Test the DataProcessor class."""
-
-    def test_process_data_valid(self):
-        """Test data processing with valid data."""
-        # Mock data
-        path = "/test/path.csv"
-        window = {"start": 0, "end": 100}
-        red_col = "red"
-        ir_col = "ir"
-
-        # Create a simple pandas-like DataFrame mock
-        import pandas as pd
-
-        test_data = {
-            "red": np.random.randn(100),
-            "ir": np.random.randn(100),
-            "waveform": np.random.randn(100),  # Add waveform column
-        }
-        mock_df = pd.DataFrame(test_data)
-
-        # Mock the read_window function to return our test DataFrame
-        with patch("src.callbacks.plot_callbacks.read_window") as mock_read:
-            mock_read.return_value = mock_df
-
-            # Mock the filter functions
-            with patch("src.callbacks.plot_callbacks.design_base_filter") as mock_filter:
-                with patch("src.callbacks.plot_callbacks.apply_chain") as mock_apply:
-                    # Set up mock return values
-                    mock_filter.return_value = np.array([[1, 0, 1]])
-                    mock_apply.return_value = np.random.randn(100)
-
-                    result = DataProcessor.process_data(
-                        path,
-                        window,
-                        red_col,
-                        ir_col,
-                        "waveform",  # Add waveform_col
-                        100,
-                        1,
-                        "butter",
-                        "bandpass",
-                        2,
-                        1.0,
-                        40.0,
-                        False,
-                        50.0,
-                        30.0,
-                        [],
-                    )
-
-                    self.assertIsNotNone(result[0])  # t
-                    self.assertIsNotNone(result[1])  # red
-                    self.assertIsNotNone(result[2])  # ir
-                    self.assertIsNotNone(result[3])  # red_ac
-                    self.assertIsNotNone(result[4])  # ir_ac
-                    self.assertIsNotNone(result[5])  # waveform
-                    self.assertIsNotNone(result[6])  # waveform_ac
-                    self.assertIsNone(result[7])  # filt_err
-
-    def test_process_data_invalid(self):
-        """Test data processing with invalid data."""
         result = DataProcessor.process_data(
-            None,
-            None,
-            None,
-            None,
-            None,  # Add waveform_col
+            path,
+            window,
+            red_col,
+            ir_col,
+            "waveform",  # Add waveform_col
             100,
             1,
             "butter",
@@ -185,94 +77,145 @@ class TestDataProcessor(unittest.TestCase):
             [],
         )
 
-        self.assertIsNone(result[0])
-        self.assertIsNone(result[1])
-        self.assertIsNone(result[2])
-        self.assertIsNone(result[3])
-        self.assertIsNone(result[4])
-        self.assertIsNone(result[5])  # waveform
-        self.assertIsNone(result[6])  # waveform_ac
-        self.assertIsNone(result[7])  # filt_err
-
-
-class TestInsightGenerator(unittest.TestCase):
-    """Test the InsightGenerator class."""
-
-    def test_generate_insights(self):
-        """Test insight generation."""
-        red = np.random.randn(1000)
-        ir = np.random.randn(1000)
-        red_ac = np.random.randn(1000)
-        ir_ac = np.random.randn(1000)
-
-        # Mock the analysis functions - use the correct import paths
-        with patch("src.utils.ppg_analysis.estimate_spo2") as mock_spo2:
-            with patch("src.utils.signal_processing.estimate_rates_psd") as mock_hr:
-                with patch("src.utils.signal_processing.quick_snr") as mock_snr:
-                    mock_spo2.return_value = (95.0, 0.5, 2.0)
-                    mock_hr.return_value = 72.0
-                    mock_snr.return_value = 15.0
-
-                    chips = InsightGenerator.generate_insights(
-                        red, ir, red_ac, ir_ac, None, "plotly"
-                    )
-
-                    self.assertIsInstance(chips, list)
-                    self.assertGreater(len(chips), 0)
-                    self.assertTrue(any("SpO₂" in str(chip) for chip in chips))
-                    self.assertTrue(any("HR_psd" in str(chip) for chip in chips))
-
-    def test_generate_insights_with_error(self):
-        """Test insight generation with filter error."""
-        red = np.random.randn(1000)
-        ir = np.random.randn(1000)
-        red_ac = np.random.randn(1000)
-        ir_ac = np.random.randn(1000)
-
-        with patch("src.utils.ppg_analysis.estimate_spo2") as mock_spo2:
-            with patch("src.utils.signal_processing.estimate_rates_psd") as mock_hr:
-                with patch("src.utils.signal_processing.quick_snr") as mock_snr:
-                    mock_spo2.return_value = (95.0, 0.5, 2.0)
-                    mock_hr.return_value = 72.0
-                    mock_snr.return_value = 15.0
-
-                    chips = InsightGenerator.generate_insights(
-                        red, ir, red_ac, ir_ac, "Test error", "plotly"
-                    )
-
-                    self.assertIsInstance(chips, list)
-                    self.assertGreater(len(chips), 0)
-                    self.assertTrue(any("Filter error" in str(chip) for chip in chips))
-
-    def test_generate_file_info(self):
-        """Test file info generation."""
-        info = InsightGenerator.generate_file_info(
+    assert result[0] is not None  # t
+    assert result[1] is not None  # red
+    assert result[2] is not None  # ir
+    assert result[3] is not None  # red_ac
+    assert result[4] is not None  # ir_ac
+    assert result[5] is not None  # waveform
+    assert result[6] is not None  # waveform_ac
+    assert result[7] is None  # filt_err
+
+
+def test_process_data_drops_unparseable_rows():
+    """Test non-numeric cells and missing values drop their rows instead of failing."""
+    import pandas as pd
+
+    red = _PAYLOAD_100.astype(object)
+    red[10] = "n/a"
+    ir = _PAYLOAD_100.copy()
+    ir[20] = np.nan
+    df = pd.DataFrame({"red": red, "ir": ir, "waveform": _PAYLOAD_100})
+
+    with patch("src.callbacks.plot_callbacks.read_window", return_value=df):
+        t, red_out, ir_out, waveform_out, *_, filt_err = DataProcessor.process_data(
             "/test/path.csv",
-            10000,
-            100,
-            200,
-            100,
+            {"start": 0, "end": 100},
+            "red",
+            "ir",
+            "waveform",
             100,
+            1,
             "butter",
             "bandpass",
             2,
-            0.5,
-            5.0,
+            1.0,
+            40.0,
             False,
-            1,
-            "ir",
-            40,
-            180,
-            0.5,
-            2.0,
-            0.5,
+            50.0,
+            30.0,
+            [],
         )
 
-        self.assertIsInstance(info, list)
-        self.assertGreater(len(info), 0)
-        self.assertTrue(any("File:" in str(item) for item in info))
-        self.assertTrue(any("Window" in str(item) for item in info))
-
-
-if __name__ == "__main__":
-    unittest.main()
+    keep = np.ones(100, dtype=bool)
+    keep[[10, 20]] = False
+    assert len(t) == 98
+    np.testing.assert_array_equal(red_out, _PAYLOAD_100[keep])
+    np.testing.assert_array_equal(ir_out, _PAYLOAD_100[keep])
+    np.testing.assert_array_equal(waveform_out, _PAYLOAD_100[keep])
+    assert filt_err is None
+
+
+def test_process_data_invalid():
+    """Test data processing with invalid data."""
+    result = DataProcessor.process_data(
+        None,
+        None,
+        None,
+        None,
+        None,  # Add waveform_col
+        100,
+        1,
+        "butter",
+        "bandpass",
+        2,
+        1.0,
+        40.0,
+        False,
+        50.0,
+        30.0,
+        [],
+    )
+
+    assert result[0] is None
+    assert result[1] is None
+    assert result[2] is None
+    assert result[3] is None
+    assert result[4] is None
+    assert result[5] is None  # waveform
+    assert result[6] is None  # waveform_ac
+    assert result[7] is None  # filt_err
+
+
+@pytest.fixture
+def insight_mocks():
+    """Patch the analysis functions used by InsightGenerator in one go."""
+    with patch.multiple(
+        "src.callbacks.plot_callbacks",
+        estimate_spo2=DEFAULT,
+        estimate_rates_psd_batch=DEFAULT,
+        quick_snr=DEFAULT,
+    ) as mocks:
+        mocks["estimate_spo2"].return_value = (95.0, 0.5, 2.0)
+        mocks["estimate_rates_psd_batch"].return_value = [[72.0, 15.0]]
+        mocks["quick_snr"].return_value = 15.0
+        yield mocks
+
+
+def test_generate_insights(insight_mocks):
+    """Test insight generation."""
+    chips = InsightGenerator.generate_insights(RED, IR, RED_AC, IR_AC, None, "plotly")
+
+    assert isinstance(chips, list)
+    assert len(chips) > 0
+    assert any("SpO₂" in str(chip) for chip in chips)
+    assert any("HR_psd" in str(chip) for chip in chips)
+
+
+def test_generate_insights_with_error(insight_mocks):
+    """Test insight generation with filter error."""
+    chips = InsightGenerator.generate_insights(RED, IR, RED_AC, IR_AC, "Test error", "plotly")
+
+    assert isinstance(chips, list)
+    assert len(chips) > 0
+    assert any("Filter error" in str(chip) for chip in chips)
+
+
+def test_generate_file_info():
+    """Test file info generation."""
+    info = InsightGenerator.generate_file_info(
+        "/test/path.csv",
+        10000,
+        100,
+        200,
+        100,
+        100,
+        "butter",
+        "bandpass",
+        2,
+        0.5,
+        5.0,
+        False,
+        1,
+        "ir",
+        40,
+        180,
+        0.5,
+        2.0,
+        0.5,
+    )
+
+    assert isinstance(info, list)
+    assert len(info) > 0
+    assert any("File:" in str(item) for item in info)
+    assert any("Window" in str(item) for item in info)
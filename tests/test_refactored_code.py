@@ -2,6 +2,7 @@
 Tests for the refactored code to ensure it works correctly.
 """
 
+from contextlib import nullcontext
 from pathlib import Path
 
 import pytest
@@ -58,53 +59,48 @@ class TestExceptions:
         assert error.details == details
 
 
-class TestValidation:
-    """Test validation functions."""
+def _expect(ok):
+    """Context manager asserting a validator passes (ok) or raises ValidationError."""
+    return nullcontext() if ok else pytest.raises(ValidationError)
 
-    def test_validate_sampling_frequency_valid(self):
-        """Test valid sampling frequency."""
-        validate_sampling_frequency(100.0)
-        validate_sampling_frequency(1000.0)
 
-    def test_validate_sampling_frequency_invalid(self):
-        """Test invalid sampling frequency."""
-        with pytest.raises(ValidationError):
-            validate_sampling_frequency(-100.0)
+@pytest.mark.parametrize("fs,ok", [(100.0, True), (1000.0, True), (-100.0, False), (0.0, False)])
+def test_validate_sampling_frequency(fs, ok):
+    """Test sampling frequency validation."""
+    with _expect(ok):
+        validate_sampling_frequency(fs)
 
-        with pytest.raises(ValidationError):
-            validate_sampling_frequency(0.0)
 
-    def test_validate_heart_rate_range_valid(self):
-        """Test valid heart rate range."""
-        validate_heart_rate_range(40, 180)
-        validate_heart_rate_range(60, 120)
-
-    def test_validate_heart_rate_range_invalid(self):
-        """Test invalid heart rate range."""
-        with pytest.raises(ValidationError):
-            validate_heart_rate_range(10, 180)  # Too low minimum
-
-        with pytest.raises(ValidationError):
-            validate_heart_rate_range(40, 400)  # Too high maximum
-
-        with pytest.raises(ValidationError):
-            validate_heart_rate_range(180, 40)  # Min > Max
-
-    def test_validate_window_parameters_valid(self):
-        """Test valid window parameters."""
-        validate_window_parameters(0, 100, 1000)
-        validate_window_parameters(100, 200, 1000)
-
-    def test_validate_window_parameters_invalid(self):
-        """Test invalid window parameters."""
-        with pytest.raises(ValidationError):
-            validate_window_parameters(-1, 100, 1000)  # Negative start
-
-        with pytest.raises(ValidationError):
-            validate_window_parameters(100, 50, 1000)  # End < Start
-
-        with pytest.raises(ValidationError):
-            validate_window_parameters(100, 1100, 1000)  # End > Total rows
+@pytest.mark.parametrize(
+    "hr_min,hr_max,ok",
+    [
+        (40, 180, True),
+        (60, 120, True),
+        (10, 180, False),  # Too low minimum
+        (40, 400, False),  # Too high maximum
+        (180, 40, False),  # Min > Max
+    ],
+)
+def test_validate_heart_rate_range(hr_min, hr_max, ok):
+    """Test heart rate range validation."""
+    with _expect(ok):
+        validate_heart_rate_range(hr_min, hr_max)
+
+
+@pytest.mark.parametrize(
+    "start,end,total,ok",
+    [
+        (0, 100, 1000, True),
+        (100, 200, 1000, True),
+        (-1, 100, 1000, False),  # Negative start
+        (100, 50, 1000, False),  # End < Start
+        (100, 1100, 1000, False),  # End > Total rows
+    ],
+)
+def test_validate_window_parameters(start, end, total, ok):
+    """Test window parameter validation."""
+    with _expect(ok):
+        validate_window_parameters(start, end, total)
 
 
 class TestFileUtils:
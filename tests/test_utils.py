@@ -2,14 +2,18 @@
 Unit tests for utility functions.
 """
 
+import base64
+import functools
 import os
-import tempfile
-import unittest
 from pathlib import Path
 
 import numpy as np
+import pandas as pd
+import pytest
 
+from src.utils.exceptions import PPGError
 from src.utils.file_utils import (
+    PYARROW_AVAILABLE,
     count_rows_quick,
     get_auto_file_path,
     get_columns_only,
@@ -22,211 +26,646 @@ from src.utils.signal_processing import (
     cross_correlation_lag,
     design_base_filter,
     estimate_rates_psd,
+    estimate_rates_psd_batch,
     quick_snr,
+    reset_online_state,
     safe_float,
+    safe_float_array,
     safe_int,
 )
 
+# Shared read-only time grids
+T_0_1_1K = np.linspace(0, 1, 1000)
+T_0_1_1K.setflags(write=False)
+T_0_10_1K = np.linspace(0, 10, 1000)
+T_0_10_1K.setflags(write=False)
+T_0_10_10K = np.linspace(0, 10, 10000)
+T_0_10_10K.setflags(write=False)
+
+
+@functools.lru_cache(maxsize=None)
+def _psd_signal(f=1.0, seed=0):
+    """Cached read-only 10 s tone at 1 kHz with seeded noise for PSD tests."""
+    x = np.sin(2 * np.pi * f * T_0_10_10K) + 0.1 * np.random.default_rng(seed).standard_normal(
+        10000
+    )
+    x.setflags(write=False)
+    return x
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_rate(f=1.0, seed=0):
+    """Memoized estimate_rates_psd on _psd_signal (the estimator is pure)."""
+    return estimate_rates_psd(_psd_signal(f, seed), 1000, (0.5, 2.0))
+
 
-class TestSignalProcessing(unittest.TestCase):
-    """Test signal processing utility functions."""
-
-    def test_safe_float(self):
-        """Test safe float conversion."""
-        self.assertEqual(safe_float("3.14", 0.0), 3.14)
-        self.assertEqual(safe_float("invalid", 2.5), 2.5)
-        self.assertEqual(safe_float(None, 1.0), 1.0)
-        self.assertEqual(safe_float(42, 0.0), 42.0)
-
-    def test_safe_int(self):
-        """Test safe integer conversion."""
-        self.assertEqual(safe_int("42", 0), 42)
-        self.assertEqual(safe_int("invalid", 10), 10)
-        self.assertEqual(safe_int(None, 5), 5)
-        self.assertEqual(safe_int(3.14, 0), 3)
-
-    def test_design_base_filter(self):
-        """Test filter design."""
-        # Test lowpass filter
-        sos = design_base_filter(100.0, "butter", "lowpass", 0.5, 5.0, 2, 1.0, 40.0)
-        self.assertGreaterEqual(sos.shape[0], 1)  # At least 1 section
-
-        # Test bandpass filter
-        sos = design_base_filter(100.0, "butter", "bandpass", 0.5, 5.0, 2, 1.0, 40.0)
-        self.assertGreaterEqual(sos.shape[0], 1)
-
-    def test_apply_chain(self):
-        """Test signal processing chain."""
-        # Create test signal
-        t = np.linspace(0, 1, 1000)
-        x = np.sin(2 * np.pi * 10 * t) + 0.1 * np.random.randn(1000)
-
-        # Test basic filtering
-        y = apply_chain(x, 1000, detrend_mean=True)
-        self.assertEqual(len(y), len(x))
-        # Detrending should reduce variance, but allow for small numerical differences
-        self.assertLessEqual(np.std(y), np.std(x) + 1e-10)
-
-        # Test with filter
-        sos = design_base_filter(1000.0, "butter", "lowpass", 0.5, 20.0, 2, 1.0, 40.0)
-        y = apply_chain(x, 1000, base_sos=sos)
-        self.assertEqual(len(y), len(x))
-
-    def test_estimate_rates_psd(self):
-        """Test rate estimation from PSD."""
-        # Create test signal with known frequency
-        t = np.linspace(0, 10, 10000)
-        fs = 1000
-        # Signal with 1 Hz component (60 bpm)
-        x = np.sin(2 * np.pi * 1 * t) + 0.1 * np.random.randn(10000)
-
-        rate = estimate_rates_psd(x, fs, (0.5, 2.0))
-        self.assertIsNotNone(rate)
-        self.assertGreater(rate, 50)  # Should be around 60 bpm
-        self.assertLess(rate, 70)
-
-    def test_quick_snr(self):
-        """Test SNR estimation."""
-        # High SNR signal
-        x_high = np.sin(2 * np.pi * 10 * np.linspace(0, 1, 1000)) + 0.01 * np.random.randn(1000)
-        snr_high = quick_snr(x_high)
-        self.assertIsNotNone(snr_high)
-        # SNR should be positive, but may not always be > 1.0 due to numerical precision
-        self.assertGreater(snr_high, 0.0)
-
-        # Low SNR signal
-        x_low = 0.01 * np.sin(2 * np.pi * 10 * np.linspace(0, 1, 1000)) + 0.1 * np.random.randn(
-            1000
-        )
-        snr_low = quick_snr(x_low)
-        self.assertIsNotNone(snr_low)
-        # The SNR calculation might give higher values than expected for synthetic data
-        # Just ensure it's a reasonable positive value
-        self.assertGreater(snr_low, 0.0)
-
-    def test_auto_decimation(self):
-        """Test auto-decimation."""
-        n = 100000
-        decim = auto_decimation(n, 1, traces=8, cap=10000)
-        self.assertGreater(decim, 1)
-        self.assertLessEqual(n // decim, 10000)
-
-    def test_cross_correlation_lag(self):
-        """Test cross-correlation."""
-        # Create test signals with a clear delay - use a simpler approach
-        t = np.linspace(0, 1, 1000)
-        x = np.sin(2 * np.pi * 10 * t) + 0.1 * np.random.randn(1000)
-
-        # Create a delayed version by shifting the array
-        delay_samples = 50
-        y = np.zeros_like(x)
-        y[delay_samples:] = x[:-delay_samples]  # Shift by 50 samples
-
-        lags, correlation, max_corr_lag = cross_correlation_lag(x, y, max_lag=100)
-        self.assertIsNotNone(lags)
-        self.assertIsNotNone(correlation)
-        self.assertIsNotNone(max_corr_lag)
-
-        print(f"DEBUG: max_corr_lag = {max_corr_lag}, expected around {delay_samples}")
-
-        # The lag should be close to the delay we created
-        # Allow for some tolerance due to noise and correlation detection
-        expected_lag = delay_samples
-        tolerance = 20  # Allow more tolerance for this test
-
-        # Check if the detected lag is within tolerance of expected
-        lag_diff = abs(abs(max_corr_lag) - expected_lag)
-        self.assertLessEqual(
-            lag_diff, tolerance, f"Expected lag close to {expected_lag}, got {max_corr_lag}"
-        )
-
-        # Verify that the correlation at the detected lag is indeed high
-        lag_idx = np.where(lags == max_corr_lag)[0]
-        if len(lag_idx) > 0:
-            corr_at_lag = correlation[lag_idx[0]]
-            # The correlation should be reasonably high
-            self.assertGreater(abs(corr_at_lag), 0.3)
-
-
-class TestFileUtils(unittest.TestCase):
-    """Test file utility functions."""
-
-    def setUp(self):
-        """Set up test data."""
-        # Create temporary CSV file
-        self.temp_file = tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False)
-        self.temp_file.write("time,red,ir\n")
-        for i in range(1000):
-            self.temp_file.write(f"{i/100:.3f},{1000+np.sin(i/10)*100},{800+np.cos(i/10)*80}\n")
-        self.temp_file.close()
-        self.temp_path = self.temp_file.name
-
-    def tearDown(self):
-        """Clean up test files."""
-        if os.path.exists(self.temp_path):
-            os.unlink(self.temp_path)
-
-    def test_count_rows_quick(self):
-        """Test quick row counting."""
-        count = count_rows_quick(self.temp_path)
-        self.assertEqual(count, 1000)  # 1000 data rows (header not counted)
-
-    def test_get_columns_only(self):
-        """Test column extraction."""
-        cols = get_columns_only(self.temp_path)
-        self.assertIn("time", cols)
-        self.assertIn("red", cols)
-        self.assertIn("ir", cols)
-        self.assertEqual(len(cols), 3)
-
-    def test_read_window(self):
-        """Test window reading."""
-        df = read_window(self.temp_path, ["red", "ir"], 100, 201)
-        self.assertEqual(len(df), 101)  # 100 to 200 inclusive
-        self.assertIn("red", df.columns)
-        self.assertIn("ir", df.columns)
-
-    def test_parse_uploaded_csv_to_temp(self):
-        """Test CSV parsing from upload."""
-        # Create a proper base64-encoded content string as expected by the function
-        import base64
-
-        csv_content = "time,red,ir\n0.0,1000,800\n0.01,1001,801\n"
-        base64_content = base64.b64encode(csv_content.encode()).decode()
-        data_url = f"data:text/csv;base64,{base64_content}"
-
-        result = parse_uploaded_csv_to_temp(data_url, "test.csv")
-
-        # The function returns a single path string
-        temp_path = result
-
-        try:
-            self.assertTrue(os.path.exists(temp_path))
-            df = read_window(temp_path, ["red", "ir"], 0, 2)
-            # read_window returns data rows only (excludes header), so we expect 2 rows
-            self.assertEqual(len(df), 2)  # 2 data rows (header not included)
-        finally:
-            if os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                except PermissionError:
-                    # On Windows, file might be locked - ignore this error
-                    pass
-
-    def test_get_auto_file_path(self):
-        """Test auto file path detection."""
-        # Test with existing file
-        path = get_auto_file_path("PPG.csv")
-        # The function may return None if no file is found
-        if path is not None:
-            self.assertIsInstance(path, str)
-
-        # Test with non-existing file
-        path = get_auto_file_path("nonexistent.csv")
-        # The function may return None if no file is found
-        if path is not None:
-            self.assertIsInstance(path, str)
-
-
-if __name__ == "__main__":
-    unittest.main()
+def test_safe_float():
+    """Test safe float conversion."""
+    assert safe_float("3.14", 0.0) == 3.14
+    assert safe_float("invalid", 2.5) == 2.5
+    assert safe_float(None, 1.0) == 1.0
+    assert safe_float(42, 0.0) == 42.0
+    assert safe_float(np.float32(1.5), 0.0) == 1.5
+    assert isinstance(safe_float(np.int64(7), 0.0), float)
+
+
+def test_safe_float_array():
+    """Test batched float conversion with fallback."""
+    np.testing.assert_array_equal(safe_float_array([1, 2.5, np.int32(3)], 0.0), [1.0, 2.5, 3.0])
+    np.testing.assert_array_equal(safe_float_array([1.0, np.nan], -1.0), [1.0, -1.0])
+    np.testing.assert_array_equal(
+        safe_float_array(["3.5", "bad", None, 4], 0.0), [3.5, 0.0, 0.0, 4.0]
+    )
+    assert safe_float_array(np.arange(4), 0.0).dtype == np.float64
+
+
+def test_safe_int():
+    """Test safe integer conversion."""
+    assert safe_int("42", 0) == 42
+    assert safe_int("invalid", 10) == 10
+    assert safe_int(None, 5) == 5
+    assert safe_int(3.14, 0) == 3
+    assert safe_int(np.int32(9), 0) == 9
+    assert safe_int(float("nan"), 4) == 4
+
+
+def test_design_base_filter():
+    """Test filter design."""
+    # Test lowpass filter
+    sos = design_base_filter(100.0, "butter", "lowpass", 0.5, 5.0, 2, 1.0, 40.0)
+    assert sos.shape[0] >= 1  # At least 1 section
+
+    # Test bandpass filter
+    sos = design_base_filter(100.0, "butter", "bandpass", 0.5, 5.0, 2, 1.0, 40.0)
+    assert sos.shape[0] >= 1
+
+
+def test_design_base_filter_cached_copy():
+    """Test repeated designs come from the cache but are independent, writable copies."""
+    args = (250.0, "cheby1", "highpass", 0.7, 5.0, 3, 1.0, 40.0)
+    sos1 = design_base_filter(*args)
+    sos2 = design_base_filter(*args)
+    np.testing.assert_array_equal(sos1, sos2)
+    assert sos1.flags.writeable
+    assert not np.shares_memory(sos1, sos2)
+
+    sos1[:] = 0.0
+    assert np.any(design_base_filter(*args) != 0.0)
+
+
+def test_apply_chain():
+    """Test signal processing chain."""
+    # Create test signal
+    x = np.sin(2 * np.pi * 10 * T_0_1_1K) + 0.1 * np.random.randn(1000)
+
+    # Test basic filtering
+    y = apply_chain(x, 1000, detrend_mean=True)
+    assert len(y) == len(x)
+    # Detrending should reduce variance, but allow for small numerical differences
+    assert np.std(y) <= np.std(x) + 1e-10
+
+    # Test with filter
+    sos = design_base_filter(1000.0, "butter", "lowpass", 0.5, 20.0, 2, 1.0, 40.0)
+    y = apply_chain(x, 1000, base_sos=sos)
+    assert len(y) == len(x)
+
+
+def test_apply_chain_noop_returns_input():
+    """Test that a chain with every stage disabled does not copy the input."""
+    x = np.random.randn(1000)
+    y = apply_chain(x, 1000)
+    assert np.shares_memory(x, y)
+    np.testing.assert_array_equal(y, x)
+
+    # Integer input is still promoted to float
+    y_int = apply_chain(np.arange(10), 1000)
+    assert y_int.dtype == np.float64
+
+
+def test_apply_chain_matches_sosfiltfilt():
+    """Test the two-section fast path agrees with scipy's sosfiltfilt."""
+    from scipy.signal import sosfiltfilt
+
+    x = np.sin(2 * np.pi * 1.2 * T_0_10_1K) + 0.1 * np.random.randn(1000)
+    sos = design_base_filter(100.0, "butter", "bandpass", 0.5, 5.0, 2, 1.0, 40.0)
+    assert sos.shape == (2, 6)
+
+    y = apply_chain(x, 100, base_sos=sos)
+    np.testing.assert_allclose(y, sosfiltfilt(sos, x), rtol=1e-9, atol=1e-9)
+
+    # Generic cascade path (4 sections)
+    sos4 = design_base_filter(100.0, "butter", "bandpass", 0.5, 3.0, 4, 1.0, 40.0)
+    y = apply_chain(x, 100, base_sos=sos4)
+    np.testing.assert_allclose(y, sosfiltfilt(sos4, x), rtol=1e-9, atol=1e-9)
+
+
+def test_apply_chain_fused_detrend_invert(monkeypatch):
+    """Test detrend/invert folded into the filter match the staged scipy chain."""
+    from scipy.signal import iirnotch, sosfiltfilt, tf2sos
+
+    x = (
+        5
+        + np.sin(2 * np.pi * 1.2 * T_0_10_1K)
+        + 0.1 * np.random.default_rng(0).standard_normal(1000)
+    )
+    sos = design_base_filter(100.0, "butter", "bandpass", 0.5, 5.0, 2, 1.0, 40.0)
+    sos_notch = tf2sos(*iirnotch(w0=10.0, Q=30.0, fs=100))
+
+    expected = -sosfiltfilt(sos_notch, sosfiltfilt(sos, x - x.mean()))
+    y = apply_chain(
+        x, 100, base_sos=sos, notch_enable=True, notch_hz=10.0, detrend_mean=True, invert=True
+    )
+    np.testing.assert_allclose(y, expected, rtol=1e-9, atol=1e-9)
+
+    # Without numba the same chain goes through scipy with the affine step applied up front
+    monkeypatch.setattr("src.utils.signal_processing._use_sos_kernels", lambda sos, y: False)
+    y = apply_chain(
+        x, 100, base_sos=sos, notch_enable=True, notch_hz=10.0, detrend_mean=True, invert=True
+    )
+    np.testing.assert_allclose(y, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_apply_chain_float32():
+    """Test float32 input stays float32 and tracks the float64 result."""
+    x = np.sin(2 * np.pi * 1.2 * T_0_10_1K) + 0.1 * np.random.default_rng(0).standard_normal(1000)
+    sos = design_base_filter(100.0, "butter", "bandpass", 0.5, 5.0, 2, 1.0, 40.0)
+
+    y64 = apply_chain(x, 100, base_sos=sos, detrend_mean=True)
+    y32 = apply_chain(x.astype(np.float32), 100, base_sos=sos, detrend_mean=True)
+    assert y64.dtype == np.float64
+    assert y32.dtype == np.float32
+    np.testing.assert_allclose(y32, y64, atol=1e-4)
+
+    # Forced precision applies to float64 input as well, on every filter path
+    for kwargs in ({}, {"zero_phase": False}, {"notch_enable": True}):
+        y = apply_chain(x, 100, base_sos=sos, dtype=np.float32, **kwargs)
+        assert y.dtype == np.float32
+
+
+def test_apply_chain_single_pass():
+    """Test zero_phase=False runs one causal sosfilt pass."""
+    from scipy.signal import sosfilt
+
+    x = np.random.randn(1000)
+    sos = design_base_filter(1000.0, "butter", "lowpass", 0.5, 20.0, 2, 1.0, 40.0)
+    y = apply_chain(x, 1000, base_sos=sos, zero_phase=False)
+    np.testing.assert_allclose(y, sosfilt(sos, x))
+
+
+def test_apply_chain_online():
+    """Test online filtering carries state across consecutive blocks."""
+    from scipy.signal import sosfilt, sosfilt_zi
+
+    x = np.sin(2 * np.pi * 10 * T_0_1_1K) + 0.1 * np.random.randn(1000)
+    sos = design_base_filter(1000.0, "butter", "lowpass", 0.5, 20.0, 2, 1.0, 40.0)
+
+    reset_online_state("test")
+    y1 = apply_chain(x[:500], 1000, base_sos=sos, online=True, stream="test")
+    y2 = apply_chain(x[500:], 1000, base_sos=sos, online=True, stream="test")
+    reset_online_state("test")
+
+    expected, _ = sosfilt(sos, x, zi=sosfilt_zi(sos) * x[0])
+    np.testing.assert_allclose(np.concatenate([y1, y2]), expected)
+
+
+def test_apply_chain_online_streams_isolated():
+    """Test online state is per stream and a stream key is required."""
+    x = np.sin(2 * np.pi * 10 * T_0_1_1K)
+    sos = design_base_filter(1000.0, "butter", "lowpass", 0.5, 20.0, 2, 1.0, 40.0)
+
+    with pytest.raises(ValueError):
+        apply_chain(x, 1000, base_sos=sos, online=True)
+
+    try:
+        red = apply_chain(x, 1000, base_sos=sos, online=True, stream=("s1", "red"))
+        ir = apply_chain(-x, 1000, base_sos=sos, online=True, stream=("s1", "ir"))
+        red2 = apply_chain(x, 1000, base_sos=sos, online=True, stream=("s1", "red"))
+        reset_online_state(("s1", "red"))
+        red_fresh = apply_chain(x, 1000, base_sos=sos, online=True, stream=("s1", "red"))
+    finally:
+        reset_online_state()
+
+    np.testing.assert_allclose(ir, -red)
+    np.testing.assert_allclose(red_fresh, red)
+    assert not np.allclose(red2, red)  # continued from the first block's state
+
+
+def test_estimate_rates_psd():
+    """Test rate estimation from PSD."""
+    # Signal with 1 Hz component (60 bpm)
+    rate = _cached_rate(1.0)
+    assert rate is not None
+    assert rate > 50  # Should be around 60 bpm
+    assert rate < 70
+
+
+def test_estimate_rates_psd_batch():
+    """Test batched rate estimation matches per-signal estimation."""
+    fs = 1000
+    params = [(1.0, 0), (1.5, 1)]
+    sigs = np.vstack([_psd_signal(f, seed) for f, seed in params])
+
+    rates = estimate_rates_psd_batch(sigs, fs, (0.5, 2.0))
+    assert len(rates) == 2
+    for (f, seed), rate in zip(params, rates):
+        assert rate == pytest.approx(_cached_rate(f, seed))
+
+    # Band outside the PSD range yields None per row
+    assert estimate_rates_psd_batch(sigs, fs, (600.0, 700.0)) == [None, None]
+
+    # Several bands are read off the same PSD, one list of per-band rates per row
+    bands = [(0.5, 2.0), (600.0, 700.0)]
+    assert estimate_rates_psd_batch(sigs, fs, bands) == [[r, None] for r in rates]
+
+
+def _gpu_shim(monkeypatch):
+    """Stand NumPy/SciPy in for CuPy so the GPU PSD path runs on the host."""
+    from types import SimpleNamespace
+
+    from scipy.signal import welch
+
+    from src.utils import signal_processing as sp
+
+    cp = SimpleNamespace(
+        asarray=np.asarray,
+        asnumpy=np.asarray,
+        searchsorted=np.searchsorted,
+        all=np.all,
+        isnan=np.isnan,
+        where=np.where,
+        argmax=np.argmax,
+        inf=np.inf,
+    )
+    monkeypatch.setattr(sp, "cp", cp, raising=False)
+    monkeypatch.setattr(sp, "cu_welch", welch, raising=False)
+    monkeypatch.setattr(sp, "CUPY_AVAILABLE", True)
+    monkeypatch.setattr(sp, "GPU_PSD_MIN_SAMPLES", 0)
+    return sp
+
+
+def test_estimate_rates_psd_batch_gpu_path(monkeypatch):
+    """Test the GPU peak search agrees with the CPU path."""
+    fs = 1000
+    sigs = np.vstack([_psd_signal(1.0, 0), _psd_signal(1.5, 1)])
+    bands = [(0.5, 2.0), (600.0, 700.0)]
+    expected = estimate_rates_psd_batch(sigs, fs, bands)
+
+    _gpu_shim(monkeypatch)
+    assert estimate_rates_psd_batch(sigs, fs, bands) == expected
+
+
+def test_estimate_rates_psd_batch_gpu_fallback(monkeypatch, caplog):
+    """Test device errors fall back to the CPU with a warning; other errors propagate."""
+    fs = 1000
+    sigs = np.vstack([_psd_signal(1.0, 0), _psd_signal(1.5, 1)])
+    expected = estimate_rates_psd_batch(sigs, fs, (0.5, 2.0))
+
+    sp = _gpu_shim(monkeypatch)
+    monkeypatch.setattr(sp, "GPU_FALLBACK_ERRORS", (MemoryError,))
+
+    def fail(*args):
+        raise MemoryError("out of device memory")
+
+    monkeypatch.setattr(sp, "_estimate_rates_psd_gpu", fail)
+    with caplog.at_level("WARNING"):
+        assert estimate_rates_psd_batch(sigs, fs, (0.5, 2.0)) == expected
+    assert "falling back to CPU" in caplog.text
+
+    monkeypatch.setattr(sp, "GPU_FALLBACK_ERRORS", ())
+    with pytest.raises(MemoryError):
+        estimate_rates_psd_batch(sigs, fs, (0.5, 2.0))
+
+
+def test_quick_snr():
+    """Test SNR estimation."""
+    # One clean tone and one noise draw shared by both cases
+    tt = np.linspace(0, 1, 1000, endpoint=False)
+    base = np.sin(2 * np.pi * 10 * tt)
+    noise = np.random.default_rng(0).standard_normal(1000)
+
+    # High SNR signal
+    x_high = base + 0.01 * noise
+    snr_high = quick_snr(x_high)
+    assert snr_high is not None
+    # SNR should be positive, but may not always be > 1.0 due to numerical precision
+    assert snr_high > 0.0
+
+    # Low SNR signal
+    x_low = 0.01 * base + 0.1 * noise
+    snr_low = quick_snr(x_low)
+    assert snr_low is not None
+    # The SNR calculation might give higher values than expected for synthetic data
+    # Just ensure it's a reasonable positive value
+    assert snr_low > 0.0
+
+
+def test_auto_decimation():
+    """Test auto-decimation."""
+    n = 100000
+    decim = auto_decimation(n, 1, traces=8, cap=10000)
+    assert decim > 1
+    assert n // decim <= 10000
+
+
+def test_cross_correlation_lag():
+    """Test cross-correlation."""
+    # Create test signals with a clear delay - use a simpler approach
+    x = np.sin(2 * np.pi * 10 * T_0_1_1K) + 0.1 * np.random.randn(1000)
+
+    # Create a delayed version by shifting the array
+    delay_samples = 50
+    y = np.empty_like(x)
+    y[:delay_samples] = 0.0
+    y[delay_samples:] = x[:-delay_samples]  # Shift by 50 samples
+
+    lags, correlation, max_corr_lag = cross_correlation_lag(x, y, max_lag=100)
+    assert lags is not None
+    assert correlation is not None
+    assert max_corr_lag is not None
+
+    print(f"DEBUG: max_corr_lag = {max_corr_lag}, expected around {delay_samples}")
+
+    # The lag should be close to the delay we created
+    # Allow for some tolerance due to noise and correlation detection
+    expected_lag = delay_samples
+    tolerance = 20  # Allow more tolerance for this test
+
+    # Check if the detected lag is within tolerance of expected
+    lag_diff = abs(abs(max_corr_lag) - expected_lag)
+    assert lag_diff <= tolerance, f"Expected lag close to {expected_lag}, got {max_corr_lag}"
+
+    # Verify that the correlation at the detected lag is indeed high
+    lag_idx = np.where(lags == max_corr_lag)[0]
+    if len(lag_idx) > 0:
+        corr_at_lag = correlation[lag_idx[0]]
+        # The correlation should be reasonably high
+        assert abs(corr_at_lag) > 0.3
+
+
+def test_cross_correlation_lag_matches_correlate():
+    """Test the FFT correlation against normalised np.correlate, restricted to max_lag."""
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(300)
+    y = rng.standard_normal(200)
+
+    lags, correlation, max_corr_lag = cross_correlation_lag(x, y, max_lag=40)
+    np.testing.assert_array_equal(lags, np.arange(-40, 41))
+
+    xm, ym = x - x.mean(), y - y.mean()
+    full = np.correlate(xm, ym, mode="full") / np.sqrt(np.dot(xm, xm) * np.dot(ym, ym))
+    expected = full[len(y) - 1 - 40 : len(y) + 40]
+    np.testing.assert_allclose(correlation, expected, atol=1e-5)
+    assert max_corr_lag == lags[np.argmax(np.abs(correlation))]
+
+
+def test_cross_correlation_lag_short_max_lag():
+    """Test the direct (few-lag) path agrees with the FFT path."""
+    from src.utils.signal_processing import _xcorr_direct, _xcorr_fft
+
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal(2000)
+    y = np.concatenate((np.zeros(7), x[:-7])) + 0.1 * rng.standard_normal(2000)
+
+    lags, correlation, max_corr_lag = cross_correlation_lag(x, y, max_lag=20)
+    assert len(lags) == 41
+    assert max_corr_lag == -7
+
+    xm, ym = x - x.mean(), y - y.mean()
+    np.testing.assert_allclose(_xcorr_direct(xm, ym, 20, 20), _xcorr_fft(xm, ym, 20, 20), atol=1e-2)
+
+
+def test_fft_backend_matches_numpy():
+    """Test transforms under the shared FFT backend agree with NumPy's."""
+    import scipy.fft
+
+    from src.utils._fft import fft_backend
+
+    x = np.random.default_rng(0).standard_normal(1000)
+    with fft_backend():
+        X = scipy.fft.rfft(x, 1024)
+        back = scipy.fft.irfft(X, 1024)[:1000]
+    np.testing.assert_allclose(X, np.fft.rfft(x, 1024), atol=1e-9)
+    np.testing.assert_allclose(back, x, atol=1e-9)
+
+
+def test_cross_correlation_lag_interpolate():
+    """Test parabolic refinement recovers a fractional delay."""
+    fs = 100
+    t = np.arange(2000) / fs
+    delay = 7.3 / fs
+    x = np.sin(2 * np.pi * 1.2 * t) + 0.5 * np.sin(2 * np.pi * 2.4 * t + 0.3)
+    y = np.sin(2 * np.pi * 1.2 * (t - delay)) + 0.5 * np.sin(2 * np.pi * 2.4 * (t - delay) + 0.3)
+
+    _, _, coarse = cross_correlation_lag(x, y, max_lag=50)
+    _, _, fine = cross_correlation_lag(x, y, max_lag=50, interpolate=True)
+    assert coarse == -7
+    assert isinstance(fine, float)
+    assert abs(fine + 7.3) < abs(coarse + 7.3)
+    assert fine == pytest.approx(-7.3, abs=0.1)
+
+
+_DATA_URL = (
+    "data:text/csv;base64,"
+    + base64.b64encode(b"time,red,ir\n0.0,1000,800\n0.01,1001,801\n").decode()
+)
+
+
+@pytest.fixture(scope="module")
+def window_csv(tmp_path_factory):
+    """Write the shared 1000-row CSV once per module."""
+    i = np.arange(1000)
+    data = np.column_stack((i / 100.0, 1000 + np.sin(i / 10.0) * 100, 800 + np.cos(i / 10.0) * 80))
+    path = tmp_path_factory.mktemp("file_utils") / "window.csv"
+    np.savetxt(
+        path,
+        data,
+        delimiter=",",
+        header="time,red,ir",
+        comments="",
+        fmt=["%.3f", "%.6f", "%.6f"],
+    )
+    return str(path)
+
+
+def test_count_rows_quick(window_csv):
+    """Test quick row counting."""
+    count = count_rows_quick(window_csv)
+    assert count == 1000  # 1000 data rows (header not counted)
+
+
+def test_count_rows_quick_unterminated(tmp_path):
+    """Test a final row without a trailing newline is still counted."""
+    path = tmp_path / "no_newline.csv"
+    path.write_bytes(b"time,red,ir\n0.0,1,2\n0.01,3,4")
+    assert count_rows_quick(str(path)) == 2
+
+
+def test_get_columns_only(window_csv):
+    """Test column extraction."""
+    cols = get_columns_only(window_csv)
+    assert "time" in cols
+    assert "red" in cols
+    assert "ir" in cols
+    assert len(cols) == 3
+
+
+def test_get_columns_only_empty_header(tmp_path, monkeypatch):
+    """Test a missing header raises its own PPGError rather than a re-wrapped one."""
+    from src.utils import file_utils
+
+    path = tmp_path / "empty.csv"
+    path.write_bytes(b"\r\n\n")
+    # pandas already rejects the file during validation; check get_columns_only's own guard
+    monkeypatch.setattr(file_utils, "validate_csv_file", lambda p: None)
+    with pytest.raises(PPGError, match="^CSV file has no header row"):
+        get_columns_only(str(path))
+
+
+def test_get_columns_only_matches_pandas(tmp_path):
+    """Test header parsing agrees with pandas for BOM, quoted and duplicate names."""
+    for name, header in [
+        ("bom.csv", b'\xef\xbb\xbftime,"red, raw",ir\r\n'),
+        ("dup.csv", b"time,red,red,\n"),
+        ("blank.csv", b"\n\r\ntime,red,ir\n"),
+    ]:
+        path = tmp_path / name
+        path.write_bytes(header + b"0,1,2,3\n")
+        assert get_columns_only(str(path)) == list(pd.read_csv(path, nrows=0).columns)
+
+
+def test_read_window(window_csv):
+    """Test window reading."""
+    df = read_window(window_csv, ["red", "ir"], 100, 201)
+    assert len(df) == 101  # 100 to 200 inclusive
+    assert "red" in df.columns
+    assert "ir" in df.columns
+
+
+@pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+def test_read_window_arrow_matches_pandas(window_csv):
+    """Test the PyArrow reader returns the same window as the pandas path."""
+    from src.utils.file_utils import _read_window_arrow
+
+    df = _read_window_arrow(Path(window_csv), ["red", "ir"], 100, 101)
+    expected = pd.read_csv(window_csv, usecols=["red", "ir"], skiprows=range(1, 101), nrows=101)
+    pd.testing.assert_frame_equal(df, expected)
+
+    # ISO timestamps must stay strings, as pandas leaves them
+    ts_csv = Path(window_csv).with_name("window_ts.csv")
+    src = pd.read_csv(window_csv)
+    src.insert(0, "stamp", pd.date_range("2024-01-01", periods=len(src), freq="10ms").astype(str))
+    src.to_csv(ts_csv, index=False)
+    df = _read_window_arrow(ts_csv, ["stamp", "red"], 100, 101)
+    expected = pd.read_csv(ts_csv, usecols=["stamp", "red"], skiprows=range(1, 101), nrows=101)
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+def test_read_window_arrow_type_change(tmp_path, monkeypatch):
+    """Test a column turning from ints to decimals past Arrow's first block still reads."""
+    from src.utils import file_utils
+
+    monkeypatch.setattr(file_utils, "_ARROW_BLOCK_SIZE", 4096)
+    monkeypatch.setattr(file_utils, "_ARROW_MIN_START_ROW", 100)
+
+    # "red" is written as integers for the first 2500 rows and decimals after
+    rows = [f"{i / 100},{i if i < 2500 else i + 0.5},{i}" for i in range(3000)]
+    path = tmp_path / "type_change.csv"
+    path.write_text("time,red,ir\n" + "\n".join(rows) + "\n")
+
+    df = read_window(str(path), ["ir", "red"], 1500, 2800)
+    expected = pd.read_csv(path, usecols=["ir", "red"], skiprows=range(1, 1501), nrows=1300)
+    pd.testing.assert_frame_equal(df, expected)
+    assert list(df.columns) == ["red", "ir"]
+
+    # Windows Arrow can read are still returned in file order
+    df = read_window(str(path), ["ir", "time"], 200, 300)
+    assert list(df.columns) == ["time", "ir"]
+
+
+def test_parse_uploaded_csv_to_temp(upload_tmpdir):
+    """Test CSV parsing from upload."""
+    temp_path = parse_uploaded_csv_to_temp(_DATA_URL, "test.csv")
+
+    # The function returns a single path string in the temp directory
+    assert os.path.exists(temp_path)
+    assert Path(temp_path).parent == upload_tmpdir
+    df = read_window(temp_path, ["red", "ir"], 0, 2)
+    # read_window returns data rows only (excludes header), so we expect 2 rows
+    assert len(df) == 2  # 2 data rows (header not included)
+
+
+@pytest.mark.parametrize("wrapped", [False, True])
+def test_parse_uploaded_csv_to_temp_chunked(upload_tmpdir, monkeypatch, wrapped):
+    """Test chunked base64 decoding and raw byte streams write identical files."""
+    import io
+
+    from src.utils import file_utils
+
+    raw = b"time,red,ir\n" + b"".join(b"%d,%d,%d\n" % (i, i + 1, i + 2) for i in range(50))
+    payload = base64.encodebytes(raw) if wrapped else base64.b64encode(raw)
+    monkeypatch.setattr(file_utils, "_UPLOAD_CHUNK", 16)
+
+    for contents in ("data:text/csv;base64," + payload.decode(), io.BytesIO(raw)):
+        assert Path(parse_uploaded_csv_to_temp(contents, "a.csv")).read_bytes() == raw
+
+
+def test_parse_uploaded_csv_to_temp_bad_payload(upload_tmpdir):
+    """Test a malformed payload raises PPGError and leaves no temp file behind."""
+    with pytest.raises(PPGError, match="Failed to parse uploaded CSV"):
+        parse_uploaded_csv_to_temp("data:text/csv;base64,abc", "x.csv")
+    assert list(upload_tmpdir.iterdir()) == []
+
+
+def test_get_auto_file_path():
+    """Test auto file path detection."""
+    # Test with existing file
+    path = get_auto_file_path("PPG.csv")
+    # The function may return None if no file is found
+    if path is not None:
+        assert isinstance(path, str)
+
+    # Test with non-existing file
+    path = get_auto_file_path("nonexistent.csv")
+    # The function may return None if no file is found
+    if path is not None:
+        assert isinstance(path, str)
+
+
+def test_get_auto_file_path_cache_invalidation(tmp_path, monkeypatch):
+    """Test cached lookups are refreshed when a searched directory changes."""
+    work = tmp_path / "a" / "b"
+    work.mkdir(parents=True)
+    monkeypatch.chdir(work)
+
+    assert get_auto_file_path("cached.csv") is None
+    (tmp_path / "a" / "cached.csv").write_text("time\n")
+    assert get_auto_file_path("cached.csv") == str((tmp_path / "a" / "cached.csv").resolve())
+
+    # A closer match shadows the cached one
+    (work / "cached.csv").write_text("time\n")
+    assert get_auto_file_path("cached.csv") == str((work / "cached.csv").resolve())
+
+    (work / "cached.csv").unlink()
+    assert get_auto_file_path("cached.csv") == str((tmp_path / "a" / "cached.csv").resolve())
+
+
+def test_get_auto_file_path_cache_bounds(tmp_path, monkeypatch):
+    """Test names with a directory part bypass the cache and the cache is bounded."""
+    from src.utils import file_utils
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(file_utils, "_AUTO_PATH_CACHE", file_utils.OrderedDict())
+    monkeypatch.setattr(file_utils, "_AUTO_PATH_CACHE_SIZE", 2)
+    (tmp_path / "sub").mkdir()
+
+    # Creating sub/late.csv changes sub's mtime but none of the searched directories'
+    assert get_auto_file_path(os.path.join("sub", "late.csv")) is None
+    (tmp_path / "sub" / "late.csv").write_text("time\n")
+    assert get_auto_file_path(os.path.join("sub", "late.csv")) == str(
+        (tmp_path / "sub" / "late.csv").resolve()
+    )
+
+    for name in ("a.csv", "b.csv", "c.csv"):
+        get_auto_file_path(name)
+    assert [key[0] for key in file_utils._AUTO_PATH_CACHE] == ["b.csv", "c.csv"]